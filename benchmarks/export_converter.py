@@ -0,0 +1,83 @@
+# Export conversion throughput on a synthetic scene, runs without Blender:
+#   python benchmarks/export_converter.py --nodes 100000
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "bevy_blender_utils"))
+
+import converter  # noqa: E402
+
+
+def synthetic_item(rng, index):
+    type_index = rng.randrange(len(converter.item_types))
+    item = {"id": "property_{}".format(index), "type": type_index}
+
+    type_name = converter.item_types[type_index][0]
+    if type_name == "string":
+        item["string"] = "value"
+    elif type_name == "bool":
+        item["bool"] = 1
+    elif type_name == "integer":
+        item["integer"] = rng.randrange(100)
+    elif type_name == "float":
+        item["float"] = rng.random()
+    elif type_name == "vector3":
+        item.update(vector3_x=rng.random(), vector3_y=rng.random(), vector3_z=rng.random())
+    elif type_name == "cuboid":
+        item.update(cuboid_x=rng.random(), offset_z=rng.random())
+    elif type_name == "sphere":
+        item.update(radius=rng.random(), offset_x=rng.random())
+    elif type_name == "capsule":
+        item.update(radius=rng.random(), height=1.0 + rng.random(), up_vector=rng.randrange(3))
+
+    return item
+
+
+def synthetic_scene(nodes, properties, seed):
+    rng = random.Random(seed)
+
+    return [
+        {
+            "bbu_properties": [synthetic_item(rng, index) for index in range(properties)],
+            "bbu_properties_index": 0,
+            "bbu_visualization": 1,
+            "bbu_visualization_show_all": 1,
+        }
+        for _ in range(nodes)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--properties", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    scene = synthetic_scene(arguments.nodes, arguments.properties, arguments.seed)
+
+    best = None
+    for _ in range(arguments.repeat):
+        nodes = copy.deepcopy(scene)
+
+        start = time.perf_counter()
+        converted = converter.convert_nodes(nodes)
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    items = arguments.nodes * arguments.properties
+    size = sum(len(json.dumps(extras, separators=(",", ":"))) for extras in nodes)
+    print("converted {} nodes ({} properties) in {:.3f} s".format(converted, items, best))
+    print("{:.0f} nodes/s, {:.0f} properties/s".format(arguments.nodes / best, items / best))
+    print("{:.1f} bytes of extras json per node".format(size / arguments.nodes))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,87 @@
-import os
-import math
-
 import bpy
-import gpu
-from gpu.types import GPUShader
-from gpu_extras.batch import batch_for_shader
+import numpy as np
+
+from . import arrays, converter, geometry, ids, live_link, meshes, validation, viewport
+from .converter import item_types, up_vectors, defaults
 
 bl_info = {
     "name": "Bevy Blender Utils",
+    "version": (0, 1, 0),
     "blender": (3, 4, 0),
     "category": "Game Engine",
 }
 
 
+list_sort_modes = [
+    ("NONE", "None", "Keep the order of the list"),
+    ("ID", "ID", "Sort by id"),
+    ("TYPE", "Type", "Sort by type"),
+]
+
+type_order = {name: order for order, (name, _label, _description) in enumerate(item_types)}
+
+# object pointer -> (id index, its version, filter settings, flags, order)
+list_filter_cache = {}
+
+
 class BBU_PROPERTIES_UL_List(bpy.types.UIList):
+    filter_type: bpy.props.EnumProperty(
+        name="Type",
+        items=[("ALL", "All", "Show every type")] + item_types,
+        default="ALL",
+    )
+    sort_by: bpy.props.EnumProperty(name="Sort By", items=list_sort_modes, default="NONE")
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon="ARROW_LEFTRIGHT")
+
+        row = layout.row(align=True)
+        row.prop(self, "filter_type", text="")
+        row.prop(self, "sort_by", text="")
+        row.prop(self, "use_filter_sort_reverse", text="", icon="SORT_DESC")
+
+    def filter_items(self, context, data, propname):
+        # only recomputed when the properties or the filter settings change, draw_item is only called for
+        # the rows that pass and are scrolled into view
+        settings = (self.filter_name, self.filter_type, self.sort_by)
+        if settings == ("", "ALL", "NONE"):
+            return [], []
+
+        items = getattr(data, propname)
+        object_ids = id_index(data)
+
+        cached = list_filter_cache.get(data.as_pointer())
+        if cached is not None and cached[0] is object_ids and cached[1] == object_ids.version and cached[2] == settings:
+            return cached[3], cached[4]
+
+        helper = bpy.types.UI_UL_list
+        visible = self.bitflag_filter_item
+
+        if self.filter_name:
+            flags = helper.filter_items_by_name(self.filter_name, visible, items, "id")
+        else:
+            flags = [visible] * len(items)
+
+        if self.filter_type != "ALL":
+            for position, item in enumerate(items):
+                if item.type != self.filter_type:
+                    flags[position] &= ~visible
+
+        if self.sort_by == "ID":
+            order = helper.sort_items_by_name(items, "id")
+        elif self.sort_by == "TYPE":
+            order = helper.sort_items_helper(
+                [(position, type_order[item.type]) for position, item in enumerate(items)],
+                lambda entry: entry[1],
+            )
+        else:
+            order = []
+
+        list_filter_cache[data.as_pointer()] = (object_ids, object_ids.version, settings, flags, order)
+        return flags, order
+
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
         if self.layout_type in {"DEFAULT", "COMPACT"}:
             column = layout.column()
@@ -52,18 +120,110 @@ class BBU_PROPERTIES_UL_List(bpy.types.UIList):
             elif item.type == "capsule":
                 text = "radius: {:.2f} height: {:.2f}".format(item.radius, item.height)
                 row.label(text=text)
+            elif item.type == "convex_hull":
+                text = "vertices: {}".format(item.hull_vertices)
+                row.label(text=text)
+            elif item.type == "vector3_array":
+                text = "points: {}".format(len(item.vector3_array))
+                row.label(text=text)
         elif self.layout_type == "GRID":
             layout.label(text="")
 
 
+def id_index(obj):
+    # index of the object's property ids, rebuilt when it is missing or out of sync
+    key = obj.as_pointer()
+    properties = obj.bbu_properties
+
+    index = ids.indices.get(key)
+    if index is None or len(index) != len(properties):
+        index = ids.IdIndex(item.id for item in properties)
+        ids.indices[key] = index
+
+    return index
+
+
+def cached_id_index(obj):
+    # index of the object only if it is already built, operators keep it up to date instead of building it
+    index = ids.indices.get(obj.as_pointer())
+    if index is not None and len(index) == len(obj.bbu_properties):
+        return index
+    return None
+
+
+def item_position(item):
+    # position of an item in the object's properties, from its path like bbu_properties[3], points of
+    # a vector3 array give the position of their item
+    path = item.path_from_id()
+    if not path.startswith("bbu_properties["):
+        return None
+    return int(path[len("bbu_properties["):path.index("]")])
+
+
+property_owners = [
+    ("OBJECT", "Object", "Properties of the active object"),
+    ("TEMPLATE", "Template", "Properties of the template the active object links to"),
+]
+
+
+def properties_owner(context, target):
+    # the object or its template text, both keep bbu_properties and bbu_properties_index
+    obj = context.object
+    if obj is None:
+        return None
+    if target == "TEMPLATE":
+        return obj.bbu_template
+    return obj
+
+
+def mark_owner_dirty(owner):
+    if isinstance(owner, bpy.types.Text):
+        viewport.mark_template_dirty(owner)
+    else:
+        viewport.mark_dirty(owner)
+
+    live_link.mark_owner(owner)
+
+
+def mark_item_dirty(item):
+    # only the edited item is parsed again
+    owner = item.id_data
+    if not isinstance(owner, (bpy.types.Object, bpy.types.Text)):
+        return
+
+    position = item_position(item)
+    if position is None:
+        mark_owner_dirty(owner)
+        return
+
+    if isinstance(owner, bpy.types.Text):
+        viewport.mark_template_item_dirty(owner, position)
+    else:
+        viewport.mark_item_dirty(owner, position)
+
+    live_link.mark_owner(owner)
+
+
 class BBU_PROPERTIES_OT_AddProperty(bpy.types.Operator):
     bl_idname = "bbu_properties.add_property"
     bl_label = "Add new property"
 
+    target: bpy.props.EnumProperty(items=property_owners, default="OBJECT")
+
     def execute(self, context):
-        properties = context.object.bbu_properties
-        properties.add()
-        context.object.bbu_properties_index = len(properties) - 1
+        owner = properties_owner(context, self.target)
+        if owner is None:
+            return {"CANCELLED"}
+
+        properties = owner.bbu_properties
+        object_ids = cached_id_index(owner)
+
+        item = properties.add()
+        if object_ids is not None:
+            object_ids.insert(len(object_ids), item.id)
+
+        owner.bbu_properties_index = len(properties) - 1
+        mark_owner_dirty(owner)
         return {"FINISHED"}
 
 
@@ -71,16 +231,27 @@ class BBU_PROPERTIES_OT_RemoveProperty(bpy.types.Operator):
     bl_idname = "bbu_properties.remove_property"
     bl_label = "Remove property"
 
+    target: bpy.props.EnumProperty(items=property_owners, default="OBJECT")
+
     @classmethod
     def poll(cls, context):
-        return context.object.bbu_properties
+        return context.object is not None
 
     def execute(self, context):
-        properties = context.object.bbu_properties
-        index = context.object.bbu_properties_index
+        owner = properties_owner(context, self.target)
+        if owner is None or not owner.bbu_properties:
+            return {"CANCELLED"}
+
+        properties = owner.bbu_properties
+        index = owner.bbu_properties_index
+        object_ids = cached_id_index(owner)
 
         properties.remove(index)
-        context.object.bbu_properties_index = min(max(0, index - 1), len(properties) - 1)
+        if object_ids is not None:
+            object_ids.remove(index)
+
+        owner.bbu_properties_index = min(max(0, index - 1), len(properties) - 1)
+        mark_owner_dirty(owner)
 
         return {"FINISHED"}
 
@@ -95,62 +266,684 @@ class BBU_PROPERTIES_OT_MoveProperty(bpy.types.Operator):
             ("DOWN", "Down", ""),
         ],
     )
+    target: bpy.props.EnumProperty(items=property_owners, default="OBJECT")
 
     @classmethod
     def poll(cls, context):
-        return context.object.bbu_properties
+        return context.object is not None
 
     def execute(self, context):
-        properties = context.object.bbu_properties
-        index = context.object.bbu_properties_index
+        owner = properties_owner(context, self.target)
+        if owner is None or not owner.bbu_properties:
+            return {"CANCELLED"}
+
+        properties = owner.bbu_properties
+        index = owner.bbu_properties_index
 
         neighbour = index + (-1 if self.direction == "UP" else 1)
+        object_ids = cached_id_index(owner)
+
         properties.move(neighbour, index)
+        if object_ids is not None and 0 <= neighbour < len(object_ids):
+            object_ids.move(neighbour, index)
 
         length = len(properties) - 1
-        context.object.bbu_properties_index = max(0, min(neighbour, length))
+        owner.bbu_properties_index = max(0, min(neighbour, length))
+        mark_owner_dirty(owner)
+
+        return {"FINISHED"}
+
+
+# raw item data copied by BBU_PROPERTIES_OT_CopyProperties
+clipboard = []
+
+
+def item_data(item):
+    # only the values that were set and that the item's type uses, same as what the exporter converts.
+    # points are kept as flat x, y, z triples.
+    used = converter.stored_keys[item.type]
+    data = {key: value for key, value in item.items() if key in used and key != "vector3_array"}
+
+    if item.type == "vector3_array":
+        data["vector3_array"] = arrays.item_points(item).reshape(-1).tolist()
+
+    return data
+
+
+def set_item_field(item, key, value):
+    if key == "vector3_array":
+        arrays.set_item_points(item, value)
+    else:
+        item[key] = value
+
+
+def set_item_data(item, data):
+    # raw assignment, skips update callbacks so bulk edits stay fast
+    for key in list(item.keys()):
+        del item[key]
+    for key, value in data.items():
+        set_item_field(item, key, value)
+
+
+def forget_properties(owner):
+    # after edits that bypass update callbacks
+    ids.indices.pop(owner.as_pointer(), None)
+    mark_owner_dirty(owner)
+
+
+def paste_properties(owner, items, mode):
+    properties = owner.bbu_properties
+    positions = {}
+
+    if mode == "REPLACE":
+        properties.clear()
+    else:
+        for position, item in enumerate(properties):
+            positions.setdefault(item.id, position)
+
+    added = []
+    for data in items:
+        position = positions.get(data.get("id", defaults["id"]))
+        if position is None:
+            added.append(data)
+        else:
+            set_item_data(properties[position], data)
+
+    # adding may reallocate the collection, so items are only looked up after it
+    start = len(properties)
+    for _data in added:
+        properties.add()
+    for position, data in enumerate(added, start):
+        set_item_data(properties[position], data)
+
+    owner.bbu_properties_index = min(max(0, owner.bbu_properties_index), len(properties) - 1)
+    forget_properties(owner)
+
+
+def selected_targets(context):
+    return [obj for obj in context.selected_objects if obj != context.object]
+
+
+def active_item(context):
+    obj = context.object
+    if obj is None:
+        return None
+
+    index = obj.bbu_properties_index
+    if index < 0 or index >= len(obj.bbu_properties):
+        return None
+
+    return obj.bbu_properties[index]
+
+
+class BBU_PROPERTIES_OT_CopyProperties(bpy.types.Operator):
+    bl_idname = "bbu_properties.copy_properties"
+    bl_label = "Copy properties"
+    bl_description = "Copy properties of the active object"
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None
+
+    def execute(self, context):
+        clipboard[:] = [item_data(item) for item in context.object.bbu_properties]
+        self.report({"INFO"}, "Copied {} properties".format(len(clipboard)))
+        return {"FINISHED"}
+
+
+class BBU_PROPERTIES_OT_PasteProperties(bpy.types.Operator):
+    bl_idname = "bbu_properties.paste_properties"
+    bl_label = "Paste properties"
+    bl_description = "Paste copied properties to every selected object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    mode: bpy.props.EnumProperty(
+        items=[
+            ("MERGE", "Merge", "Overwrite properties with the same id and add the rest"),
+            ("REPLACE", "Replace", "Replace all properties"),
+        ],
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return bool(clipboard) and bool(context.selected_objects)
+
+    def execute(self, context):
+        for obj in context.selected_objects:
+            paste_properties(obj, clipboard, self.mode)
+
+        return {"FINISHED"}
+
+
+class BBU_PROPERTIES_OT_CopyToSelected(bpy.types.Operator):
+    bl_idname = "bbu_properties.copy_to_selected"
+    bl_label = "Copy properties to selected"
+    bl_description = "Copy properties of the active object to every other selected object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    mode: bpy.props.EnumProperty(
+        items=[
+            ("MERGE", "Merge", "Overwrite properties with the same id and add the rest"),
+            ("REPLACE", "Replace", "Replace all properties"),
+        ],
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and len(context.selected_objects) > 1
+
+    def execute(self, context):
+        items = [item_data(item) for item in context.object.bbu_properties]
+
+        targets = selected_targets(context)
+        for obj in targets:
+            paste_properties(obj, items, self.mode)
 
+        self.report({"INFO"}, "Copied {} properties to {} objects".format(len(items), len(targets)))
         return {"FINISHED"}
 
 
-item_types = [
-    ("string", "String", "String"),
-    ("bool", "Boolean", "Boolean"),
-    ("integer", "Integer", "Integer"),
-    ("float", "Float", "Float"),
-    ("vector3", "Vector3", "Vector3"),
-    ("cuboid", "Cuboid", "Cuboid"),
-    ("sphere", "Sphere", "Sphere"),
-    ("capsule", "Capsule", "Capsule"),
+class BBU_PROPERTIES_OT_ApplyToSelected(bpy.types.Operator):
+    bl_idname = "bbu_properties.apply_to_selected"
+    bl_label = "Apply to selected"
+    bl_description = "Set a field of the active property on properties with the same id of every selected object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    field: bpy.props.EnumProperty(
+        items=[("ALL", "All", "Every field")] + [
+            (name, name, "") for name in defaults if name != "id"
+        ],
+    )
+    add_missing: bpy.props.BoolProperty(
+        name="Add Missing",
+        description="Add the property to selected objects that don't have it",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return active_item(context) is not None and len(context.selected_objects) > 1
+
+    def execute(self, context):
+        source = active_item(context)
+        data = item_data(source)
+        id = source.id
+        # added properties take the type of the active one, so only fields it uses can be added
+        addable = self.add_missing and (self.field == "ALL" or self.field in converter.stored_keys[source.type])
+
+        for obj in selected_targets(context):
+            properties = obj.bbu_properties
+            positions = [position for position, item in enumerate(properties) if item.id == id]
+
+            if not positions and addable:
+                properties.add()
+                positions = [len(properties) - 1]
+                set_item_data(properties[positions[0]], {"id": id, "type": data.get("type", 0)})
+
+            for position in positions:
+                item = properties[position]
+                if self.field == "ALL":
+                    set_item_data(item, data)
+                elif self.field == "type":
+                    # values the new type doesn't use are dropped, same as changing it from the ui
+                    item["type"] = data.get("type", 0)
+                    update_value(item, context)
+                elif self.field not in converter.stored_keys[item.type]:
+                    continue
+                elif self.field in data:
+                    set_item_field(item, self.field, data[self.field])
+                else:
+                    del_if_exists(item, self.field)
+
+            if positions:
+                forget_properties(obj)
+
+        return {"FINISHED"}
+
+
+class BBU_PROPERTIES_OT_RemoveFromSelected(bpy.types.Operator):
+    bl_idname = "bbu_properties.remove_from_selected"
+    bl_label = "Remove from selected"
+    bl_description = "Remove properties with the given id from every selected object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    id: bpy.props.StringProperty(name="ID")
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.selected_objects)
+
+    def invoke(self, context, _event):
+        item = active_item(context)
+        if item is not None:
+            self.id = item.id
+        return self.execute(context)
+
+    def execute(self, context):
+        removed = 0
+
+        for obj in context.selected_objects:
+            properties = obj.bbu_properties
+            positions = [position for position, item in enumerate(properties) if item.id == self.id]
+
+            for position in reversed(positions):
+                properties.remove(position)
+
+            if positions:
+                removed += len(positions)
+                obj.bbu_properties_index = min(max(0, obj.bbu_properties_index), len(properties) - 1)
+                forget_properties(obj)
+
+        self.report({"INFO"}, "Removed {} properties".format(removed))
+        return {"FINISHED"}
+
+
+fit_shapes = [
+    ("CUBOID", "Cuboid", "Axis aligned bounding box"),
+    ("SPHERE", "Sphere", "Minimal bounding sphere"),
+    ("CAPSULE", "Capsule", "Capsule along the principal axis of the mesh"),
 ]
 
-up_vectors = [
-    ("zp", "Z+", "Z+"),
-    ("yp", "Y+", "Y+"),
-    ("xp", "X+", "Z+"),
+
+def fitted_item(id, shape, points):
+    # raw item data of a collider fitted to points
+    data = {"id": id}
+
+    if shape == "CUBOID":
+        half_extents, center = geometry.fit_cuboid(points)
+        data["type"] = type_order["cuboid"]
+        data.update(zip(("cuboid_x", "cuboid_y", "cuboid_z"), half_extents.tolist()))
+    elif shape == "SPHERE":
+        radius, center = geometry.fit_sphere(points)
+        data["type"] = type_order["sphere"]
+        data["radius"] = radius
+    else:
+        radius, height, up_vector, center = geometry.fit_capsule(points)
+        data["type"] = type_order["capsule"]
+        data["radius"] = radius
+        data["height"] = height
+        data["up_vector"] = [name for name, _label, _description in up_vectors].index(up_vector)
+
+    data.update(zip(("offset_x", "offset_y", "offset_z"), center.tolist()))
+    return data
+
+
+class BBU_PROPERTIES_OT_FitCollider(bpy.types.Operator):
+    bl_idname = "bbu_properties.fit_collider"
+    bl_label = "Fit collider"
+    bl_description = "Add or update a collider fitted to the evaluated mesh of every selected object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    shape: bpy.props.EnumProperty(name="Shape", items=fit_shapes, default="CUBOID")
+    id: bpy.props.StringProperty(
+        name="ID",
+        description="Property that is added, or updated if the object already has it",
+        default="collider",
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.selected_objects)
+
+    def execute(self, context):
+        depsgraph = context.evaluated_depsgraph_get()
+        fitted = 0
+
+        for obj in context.selected_objects:
+            points = meshes.evaluated_points(obj, depsgraph)
+            if points is None:
+                continue
+
+            paste_properties(obj, [fitted_item(self.id, self.shape, points)], "MERGE")
+            fitted += 1
+
+        self.report({"INFO"}, "Fitted {} colliders".format(fitted))
+        return {"FINISHED"}
+
+
+class BBU_PROPERTIES_OT_NewTemplate(bpy.types.Operator):
+    bl_idname = "bbu_properties.new_template"
+    bl_label = "New template"
+    bl_description = "Create a template from the properties of the active object and link the object to it"
+    bl_options = {"REGISTER", "UNDO"}
+
+    move: bpy.props.BoolProperty(
+        name="Move Properties",
+        description="Remove the properties from the object, so it only keeps its overrides",
+        default=True,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None
+
+    def execute(self, context):
+        obj = context.object
+
+        template = bpy.data.texts.new("{} Template".format(obj.name))
+        paste_properties(template, [item_data(item) for item in obj.bbu_properties], "REPLACE")
+
+        obj.bbu_template = template
+        if self.move:
+            obj.bbu_properties.clear()
+            obj.bbu_properties_index = 0
+
+        forget_properties(obj)
+        viewport.mark_template_dirty(template)
+        return {"FINISHED"}
+
+
+class BBU_PROPERTIES_OT_LinkTemplate(bpy.types.Operator):
+    bl_idname = "bbu_properties.link_template"
+    bl_label = "Link template to selected"
+    bl_description = "Link every selected object to the template of the active object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    clear: bpy.props.BoolProperty(
+        name="Clear Properties",
+        description="Remove the properties of the selected objects, so they only use the template",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.bbu_template is not None
+
+    def execute(self, context):
+        template = context.object.bbu_template
+
+        targets = selected_targets(context)
+        for obj in targets:
+            obj.bbu_template = template
+            if self.clear:
+                obj.bbu_properties.clear()
+                obj.bbu_properties_index = 0
+            forget_properties(obj)
+
+        self.report({"INFO"}, "Linked {} objects to {}".format(len(targets), template.name))
+        return {"FINISHED"}
+
+
+def active_points_item(context, target):
+    # (owner, active item) when the active item of the owner is a vector3_array
+    owner = properties_owner(context, target)
+    if owner is None:
+        return None, None
+
+    index = owner.bbu_properties_index
+    if index < 0 or index >= len(owner.bbu_properties):
+        return owner, None
+
+    item = owner.bbu_properties[index]
+    return owner, item if item.type == "vector3_array" else None
+
+
+class BBU_PROPERTIES_OT_AddPoint(bpy.types.Operator):
+    bl_idname = "bbu_properties.add_point"
+    bl_label = "Add point"
+    bl_description = "Add a point at the 3D cursor to the active vector3 array"
+    bl_options = {"REGISTER", "UNDO"}
+
+    target: bpy.props.EnumProperty(items=property_owners, default="OBJECT")
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None
+
+    def execute(self, context):
+        owner, item = active_points_item(context, self.target)
+        if item is None:
+            return {"CANCELLED"}
+
+        point = item.vector3_array.add()
+        point.co = context.object.matrix_world.inverted() @ context.scene.cursor.location
+        item.vector3_array_index = len(item.vector3_array) - 1
+
+        mark_owner_dirty(owner)
+        return {"FINISHED"}
+
+
+class BBU_PROPERTIES_OT_RemovePoint(bpy.types.Operator):
+    bl_idname = "bbu_properties.remove_point"
+    bl_label = "Remove point"
+    bl_description = "Remove the active point, or every point, of the active vector3 array"
+    bl_options = {"REGISTER", "UNDO"}
+
+    target: bpy.props.EnumProperty(items=property_owners, default="OBJECT")
+    all: bpy.props.BoolProperty(name="All", default=False)
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None
+
+    def execute(self, context):
+        owner, item = active_points_item(context, self.target)
+        if item is None or not item.vector3_array:
+            return {"CANCELLED"}
+
+        points = item.vector3_array
+        if self.all:
+            points.clear()
+        else:
+            points.remove(min(max(0, item.vector3_array_index), len(points) - 1))
+        item.vector3_array_index = min(max(0, item.vector3_array_index - 1), len(points) - 1)
+
+        mark_owner_dirty(owner)
+        return {"FINISHED"}
+
+
+class BBU_PROPERTIES_OT_PointsFromMesh(bpy.types.Operator):
+    bl_idname = "bbu_properties.points_from_mesh"
+    bl_label = "Points from selected meshes"
+    bl_description = (
+        "Set the points of the active vector3 array to the vertices of the evaluated meshes of the other "
+        "selected objects, in the space of the active object"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    target: bpy.props.EnumProperty(items=property_owners, default="OBJECT")
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and len(context.selected_objects) > 1
+
+    def execute(self, context):
+        owner, item = active_points_item(context, self.target)
+        if item is None:
+            return {"CANCELLED"}
+
+        depsgraph = context.evaluated_depsgraph_get()
+        to_local = np.array(context.object.matrix_world.inverted())
+        positions = []
+
+        for obj in selected_targets(context):
+            points = meshes.evaluated_points(obj, depsgraph)
+            if points is None:
+                continue
+
+            matrix = to_local @ np.array(obj.matrix_world)
+            positions.append(points @ matrix[:3, :3].T + matrix[:3, 3])
+
+        positions = np.concatenate(positions) if positions else np.zeros((0, 3))
+        arrays.set_item_points(item, positions)
+
+        mark_owner_dirty(owner)
+        self.report({"INFO"}, "Set {} points".format(len(positions)))
+        return {"FINISHED"}
+
+
+def effective_items(obj):
+    # items of an object as they are exported: template items it doesn't override, then its own items,
+    # the first item of an id wins
+    items = list(obj.bbu_properties)
+    if obj.bbu_template is not None:
+        overridden = {item.id for item in items}
+        items = [item for item in obj.bbu_template.bbu_properties if item.id not in overridden] + items
+
+    seen = set()
+    for item in items:
+        if item.id == "" or item.id in seen:
+            continue
+        seen.add(item.id)
+        yield item
+
+
+# up vector -> capsule axis in blender coordinates
+up_axes = {name: np.identity(3)[axis] for axis, name in geometry.axis_up_vectors.items()}
+
+
+def object_colliders(obj, depsgraph):
+    # world space colliders of an object's items, owned by the object's name
+    matrix = np.array(obj.matrix_world)
+    colliders = []
+
+    for item in effective_items(obj):
+        offset = (item.offset_x, item.offset_y, item.offset_z)
+
+        if item.type == "cuboid":
+            half_extents = (item.cuboid_x, item.cuboid_y, item.cuboid_z)
+            colliders.append(validation.cuboid(obj.name, item.id, matrix, half_extents, offset))
+        elif item.type == "sphere":
+            colliders.append(validation.sphere(obj.name, item.id, matrix, item.radius, offset))
+        elif item.type == "capsule":
+            colliders.append(validation.capsule(
+                obj.name, item.id, matrix, item.radius, item.height, up_axes[item.up_vector], offset,
+            ))
+        elif item.type == "convex_hull":
+            _key, (vertices, triangles) = meshes.object_hull(obj, item.hull_vertices, depsgraph)
+            colliders.append(validation.hull(obj.name, item.id, matrix, vertices, triangles))
+
+    return colliders
+
+
+def validate_objects(objects, depsgraph, tolerance=validation.TOLERANCE):
+    # findings of the colliders of every object, usable without a ui
+    colliders = []
+    for obj in objects:
+        if obj.bbu_properties or obj.bbu_template is not None:
+            colliders.extend(object_colliders(obj, depsgraph))
+
+    return validation.validate(colliders, tolerance)
+
+
+finding_kinds = [
+    ("DEGENERATE", "Degenerate", "Collider dimensions can't be exported or drawn as intended"),
+    ("OVERLAP", "Overlap", "Colliders of different objects intersect"),
+    ("CONTAINED", "Contained", "A collider sits inside a collider of another object"),
 ]
 
-defaults = {
-    "id": "unnamed",
-    "type": "string",
-    "string": "",
-    "bool": False,
-    "integer": 0,
-    "float": 0.0,
-    "vector3_x": 0.0,
-    "vector3_y": 0.0,
-    "vector3_z": 0.0,
-    "offset_x": 0.0,
-    "offset_y": 0.0,
-    "offset_z": 0.0,
-    "cuboid_x": 0.5,
-    "cuboid_y": 0.5,
-    "cuboid_z": 0.5,
-    "radius": 0.5,
-    "height": 1.0,
-    "up_vector": "zp",
+finding_icons = {
+    "DEGENERATE": "ERROR",
+    "OVERLAP": "SELECT_INTERSECT",
+    "CONTAINED": "SELECT_SUBTRACT",
 }
 
+validation_scopes = [
+    ("SCENE", "Scene", "Every object of the scene"),
+    ("SELECTED", "Selected", "Selected objects"),
+]
+
+
+def store_findings(scene, findings):
+    stored = scene.bbu_validation_findings
+    stored.clear()
+
+    for finding in findings:
+        item = stored.add()
+        item.kind = finding.kind
+        item.message = finding.message
+        owners = [bpy.data.objects.get(collider.owner) for collider in finding.colliders]
+        item.first = owners[0]
+        item.second = owners[1] if len(owners) > 1 else None
+
+    scene.bbu_validation_index = -1
+
+
+def select_finding(self, context):
+    # update of bbu_validation_index, selects the objects of the clicked finding
+    findings = self.bbu_validation_findings
+    index = self.bbu_validation_index
+    if index < 0 or index >= len(findings):
+        return
+
+    finding = findings[index]
+    view_layer = context.view_layer
+    objects = [obj for obj in (finding.first, finding.second) if obj is not None and obj.name in view_layer.objects]
+    if not objects:
+        return
+
+    for obj in context.selected_objects:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    view_layer.objects.active = objects[0]
+
+
+class BBU_PROPERTIES_OT_ValidateColliders(bpy.types.Operator):
+    bl_idname = "bbu_properties.validate_colliders"
+    bl_label = "Validate colliders"
+    bl_description = (
+        "Find degenerate colliders and colliders of different objects that overlap or sit inside each other"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    scope: bpy.props.EnumProperty(name="Scope", items=validation_scopes, default="SCENE")
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Overlaps shallower than this are treated as touching",
+        default=validation.TOLERANCE,
+        min=0.0,
+        subtype="DISTANCE",
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene is not None
+
+    def execute(self, context):
+        objects = context.scene.objects if self.scope == "SCENE" else context.selected_objects
+        findings = validate_objects(objects, context.evaluated_depsgraph_get(), self.tolerance)
+        store_findings(context.scene, findings)
+
+        if bpy.app.background:
+            for finding in findings:
+                print("bevy_blender_utils: {}".format(finding))
+
+        self.report({"WARNING"} if findings else {"INFO"}, "Found {} collider problems".format(len(findings)))
+        return {"FINISHED"}
+
+
+live_link_actions = [
+    ("START", "Start", "Listen for Bevy apps and stream property changes to them"),
+    ("STOP", "Stop", "Disconnect every Bevy app and stop listening"),
+    ("RESYNC", "Resync", "Send every object's properties again"),
+]
+
+
+class BBU_PROPERTIES_OT_LiveLink(bpy.types.Operator):
+    bl_idname = "bbu_properties.live_link"
+    bl_label = "Live link"
+    bl_description = "Stream property changes to running Bevy apps over a localhost socket"
+
+    action: bpy.props.EnumProperty(name="Action", items=live_link_actions, default="START")
+
+    def execute(self, context):
+        if self.action == "STOP":
+            live_link.stop()
+        elif self.action == "RESYNC":
+            if not live_link.running():
+                return {"CANCELLED"}
+            live_link.link.mark_all()
+        else:
+            port = context.scene.bbu_live_link_port
+            try:
+                live_link.start(port, object_data)
+            except OSError as error:
+                self.report({"ERROR"}, "Couldn't listen on port {}: {}".format(port, error))
+                return {"CANCELLED"}
+
+        return {"FINISHED"}
+
 
 def del_if_exists(obj, prop):
     if prop in obj:
@@ -158,50 +951,112 @@ def del_if_exists(obj, prop):
 
 
 def update_value(self, _context):
-    del_if_exists(self, "string")
-    del_if_exists(self, "bool")
-    del_if_exists(self, "integer")
-    del_if_exists(self, "float")
+    if isinstance(self.id_data, (bpy.types.Object, bpy.types.Text)):
+        object_ids = cached_id_index(self.id_data)
+        if object_ids is not None:
+            object_ids.touch()
 
-    del_if_exists(self, "vector3_x")
-    del_if_exists(self, "vector3_y")
-    del_if_exists(self, "vector3_z")
+    strip_stale_fields(self)
+    mark_item_dirty(self)
 
-    del_if_exists(self, "offset_x")
-    del_if_exists(self, "offset_y")
-    del_if_exists(self, "offset_z")
 
-    del_if_exists(self, "cuboid_x")
-    del_if_exists(self, "cuboid_y")
-    del_if_exists(self, "cuboid_z")
+def update_item(self, _context):
+    mark_item_dirty(self)
 
-    del_if_exists(self, "radius")
-    del_if_exists(self, "height")
 
+def strip_stale_fields(item):
+    # items only keep the fields their type uses, returns how many were removed
+    stale = converter.stale_fields(item.keys(), item.type)
+    for key in stale:
+        del item[key]
 
-class BBUDataListItem(bpy.types.PropertyGroup):
-    id: bpy.props.StringProperty(name="id", default="unnamed")
-    type: bpy.props.EnumProperty(items=item_types, default="string", update=update_value)
-    string: bpy.props.StringProperty(name="string", default=defaults["string"])
-    bool: bpy.props.BoolProperty(name="bool", default=defaults["bool"])
-    integer: bpy.props.IntProperty(name="integer", default=defaults["integer"])
-    float: bpy.props.FloatProperty(name="float", default=defaults["float"])
+    return len(stale)
+
+
+# bumped when stored items change shape, migrate_data brings older files up to date
+DATA_VERSION = 1
+
+
+def migrate_data():
+    # linked scenes can't have their version written, they'd keep the migration running on every load
+    if all(scene.bbu_data_version >= DATA_VERSION for scene in bpy.data.scenes if scene.library is None):
+        return
+
+    # version 1: fields of other types are no longer kept around after a type change
+    stripped = 0
+    for owner in list(bpy.data.objects) + list(bpy.data.texts):
+        if owner.library is not None:
+            continue
+        for item in owner.bbu_properties:
+            stripped += strip_stale_fields(item)
+
+    for scene in bpy.data.scenes:
+        if scene.library is None:
+            scene.bbu_data_version = DATA_VERSION
+
+    if stripped:
+        print("bevy_blender_utils: removed {} unused property fields".format(stripped))
+
+
+def update_id(self, _context):
+    if not isinstance(self.id_data, (bpy.types.Object, bpy.types.Text)):
+        return
+
+    position = item_position(self)
+    object_ids = cached_id_index(self.id_data)
+    if position is not None and object_ids is not None:
+        object_ids.set(position, self.id)
 
-    vector3_x: bpy.props.FloatProperty(name="vector3_x", default=defaults["vector3_x"])
-    vector3_y: bpy.props.FloatProperty(name="vector3_y", default=defaults["vector3_y"])
-    vector3_z: bpy.props.FloatProperty(name="vector3_z", default=defaults["vector3_z"])
+    # ids decide which template items are overridden
+    mark_owner_dirty(self.id_data)
 
-    offset_x: bpy.props.FloatProperty(name="offset_x", default=defaults["offset_x"])
-    offset_y: bpy.props.FloatProperty(name="offset_y", default=defaults["offset_y"])
-    offset_z: bpy.props.FloatProperty(name="offset_z", default=defaults["offset_z"])
 
-    cuboid_x: bpy.props.FloatProperty(name="cuboid_x", default=defaults["cuboid_x"])
-    cuboid_y: bpy.props.FloatProperty(name="cuboid_y", default=defaults["cuboid_y"])
-    cuboid_z: bpy.props.FloatProperty(name="cuboid_z", default=defaults["cuboid_z"])
+class BBUPoint(bpy.types.PropertyGroup):
+    co: bpy.props.FloatVectorProperty(name="co", size=3, subtype="XYZ", update=update_item)
 
-    radius: bpy.props.FloatProperty(name="radius", default=defaults["radius"])
-    height: bpy.props.FloatProperty(name="height", default=defaults["height"])
-    up_vector: bpy.props.EnumProperty(items=up_vectors, default=defaults["up_vector"])
+
+class BBUFinding(bpy.types.PropertyGroup):
+    kind: bpy.props.EnumProperty(items=finding_kinds)
+    message: bpy.props.StringProperty()
+    first: bpy.props.PointerProperty(type=bpy.types.Object)
+    second: bpy.props.PointerProperty(type=bpy.types.Object)
+
+
+class BBUDataListItem(bpy.types.PropertyGroup):
+    id: bpy.props.StringProperty(name="id", default="unnamed", update=update_id)
+    type: bpy.props.EnumProperty(items=item_types, default="string", update=update_value)
+    string: bpy.props.StringProperty(name="string", default=defaults["string"], update=update_item)
+    bool: bpy.props.BoolProperty(name="bool", default=defaults["bool"], update=update_item)
+    integer: bpy.props.IntProperty(name="integer", default=defaults["integer"], update=update_item)
+    float: bpy.props.FloatProperty(name="float", default=defaults["float"], update=update_item)
+
+    vector3_x: bpy.props.FloatProperty(name="vector3_x", default=defaults["vector3_x"], update=update_item)
+    vector3_y: bpy.props.FloatProperty(name="vector3_y", default=defaults["vector3_y"], update=update_item)
+    vector3_z: bpy.props.FloatProperty(name="vector3_z", default=defaults["vector3_z"], update=update_item)
+
+    offset_x: bpy.props.FloatProperty(name="offset_x", default=defaults["offset_x"], update=update_item)
+    offset_y: bpy.props.FloatProperty(name="offset_y", default=defaults["offset_y"], update=update_item)
+    offset_z: bpy.props.FloatProperty(name="offset_z", default=defaults["offset_z"], update=update_item)
+
+    cuboid_x: bpy.props.FloatProperty(name="cuboid_x", default=defaults["cuboid_x"], update=update_item)
+    cuboid_y: bpy.props.FloatProperty(name="cuboid_y", default=defaults["cuboid_y"], update=update_item)
+    cuboid_z: bpy.props.FloatProperty(name="cuboid_z", default=defaults["cuboid_z"], update=update_item)
+
+    radius: bpy.props.FloatProperty(name="radius", default=defaults["radius"], update=update_item)
+    height: bpy.props.FloatProperty(name="height", default=defaults["height"], update=update_item)
+    up_vector: bpy.props.EnumProperty(items=up_vectors, default=defaults["up_vector"], update=update_item)
+
+    hull_vertices: bpy.props.IntProperty(
+        name="hull_vertices",
+        description="Most vertices the convex hull of the object's mesh is simplified to",
+        default=defaults["hull_vertices"],
+        min=4,
+        max=255,
+        update=update_item,
+    )
+
+    vector3_array: bpy.props.CollectionProperty(type=BBUPoint)
+    vector3_array_index: bpy.props.IntProperty(name="Point Index", default=0)
 
 
 class BBUPanel(bpy.types.Panel):
@@ -225,6 +1080,31 @@ class BBUPanel(bpy.types.Panel):
         column.prop(obj, "bbu_visualization_show_all", text="Show All", toggle=True)
         column.enabled = obj.bbu_visualization
 
+        row = layout.row()
+        row.prop(context.scene, "bbu_visualization_mode", text="Visualize", expand=True)
+        row.prop(context.scene, "bbu_visualization_instanced", toggle=True)
+
+        row = layout.row()
+        row.prop(context.scene, "bbu_visualization_lod", toggle=True)
+        column = row.row()
+        column.prop(context.scene, "bbu_visualization_lod_min", text="Min")
+        column.prop(context.scene, "bbu_visualization_lod_max", text="Max")
+        column.enabled = context.scene.bbu_visualization_lod
+        row.prop(context.scene, "bbu_visualization_culling", text="Culling", toggle=True)
+        row.prop(context.scene, "bbu_visualization_stats", text="Stats", toggle=True)
+
+        row = layout.row()
+        row.prop(context.scene, "bbu_export_format", text="Export", expand=True)
+
+        row = layout.row()
+        if live_link.running():
+            row.operator("bbu_properties.live_link", text="Stop Live Link", icon="LINKED").action = "STOP"
+            row.operator("bbu_properties.live_link", text="Resync").action = "RESYNC"
+            row.label(text="{} connected".format(len(live_link.link.clients)))
+        else:
+            row.operator("bbu_properties.live_link", text="Start Live Link", icon="UNLINKED").action = "START"
+            row.prop(context.scene, "bbu_live_link_port", text="Port")
+
         row = layout.row()
         row.template_list(
             "BBU_PROPERTIES_UL_List", "Bevy Properties", obj, "bbu_properties", obj, "bbu_properties_index"
@@ -238,6 +1118,18 @@ class BBUPanel(bpy.types.Panel):
         row.operator("bbu_properties.move_property", text="Move Up").direction = "UP"
         row.operator("bbu_properties.move_property", text="Move Down").direction = "DOWN"
 
+        row = layout.row()
+        row.operator("bbu_properties.copy_properties", text="Copy")
+        row.operator("bbu_properties.paste_properties", text="Paste Merge").mode = "MERGE"
+        row.operator("bbu_properties.paste_properties", text="Paste Replace").mode = "REPLACE"
+
+        row = layout.row()
+        row.operator("bbu_properties.copy_to_selected", text="Copy to Selected").mode = "MERGE"
+        row.operator("bbu_properties.copy_to_selected", text="Replace Selected").mode = "REPLACE"
+
+        row = layout.row()
+        row.operator_menu_enum("bbu_properties.fit_collider", "shape", text="Fit Collider to Selected")
+
         if index < 0:
             return
         if index >= len(properties):
@@ -247,53 +1139,186 @@ class BBUPanel(bpy.types.Panel):
 
         layout.separator()
 
-        ids = list(map(lambda x: x.id, properties))
+        draw_id_collisions(layout, obj)
+
+        row = layout.row()
+        row.prop(item, "type", text="Type")
+        row.prop(item, "id", text="ID")
+
+        row = layout.row()
+        row.operator_menu_enum("bbu_properties.apply_to_selected", "field", text="Apply to Selected")
+        row.operator("bbu_properties.remove_from_selected", text="Remove from Selected")
+
+        draw_item_values(layout, item, "OBJECT")
+
+
+class BBUTemplatePanel(bpy.types.Panel):
+    bl_idname = "OBJECT_PT_bbu_template_panel"
+    bl_parent_id = "OBJECT_PT_bbu_panel"
+    bl_label = "Template"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "object"
+
+    def draw(self, context):
+        layout = self.layout
+        obj = context.object
+        template = obj.bbu_template
+
+        row = layout.row()
+        row.prop(obj, "bbu_template", text="")
+        row.operator("bbu_properties.new_template", text="New from Object")
+        row.operator("bbu_properties.link_template", text="Link Selected")
+
+        if template is None:
+            return
+
+        layout.label(text="Object properties override template properties with the same id")
+
+        row = layout.row()
+        row.template_list(
+            "BBU_PROPERTIES_UL_List", "Template Properties",
+            template, "bbu_properties", template, "bbu_properties_index",
+        )
+
+        row = layout.row()
+        row.operator("bbu_properties.add_property", text="Add Property").target = "TEMPLATE"
+        row.operator("bbu_properties.remove_property", text="Remove Property").target = "TEMPLATE"
+
+        row = layout.row()
+        operator = row.operator("bbu_properties.move_property", text="Move Up")
+        operator.direction = "UP"
+        operator.target = "TEMPLATE"
+        operator = row.operator("bbu_properties.move_property", text="Move Down")
+        operator.direction = "DOWN"
+        operator.target = "TEMPLATE"
+
+        properties = template.bbu_properties
+        index = template.bbu_properties_index
+
+        if index < 0:
+            return
+        if index >= len(properties):
+            return
 
-        if len(ids) != len(set(ids)):
-            row = layout.row()
-            row.label(text="IDs must be unique!")
+        item = properties[index]
+
+        layout.separator()
+
+        draw_id_collisions(layout, template)
 
         row = layout.row()
         row.prop(item, "type", text="Type")
         row.prop(item, "id", text="ID")
 
+        draw_item_values(layout, item, "TEMPLATE")
+
+
+class BBUValidationPanel(bpy.types.Panel):
+    bl_idname = "OBJECT_PT_bbu_validation_panel"
+    bl_parent_id = "OBJECT_PT_bbu_panel"
+    bl_label = "Validation"
+    bl_space_type = "PROPERTIES"
+    bl_region_type = "WINDOW"
+    bl_context = "object"
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
         row = layout.row()
+        row.operator("bbu_properties.validate_colliders", text="Validate Scene").scope = "SCENE"
+        row.operator("bbu_properties.validate_colliders", text="Validate Selected").scope = "SELECTED"
 
-        if item.type == "string":
-            row.prop(item, "string", text="Value")
-        elif item.type == "bool":
-            row.prop(item, "bool", text="Value")
-        elif item.type == "integer":
-            row.prop(item, "integer", text="Value")
-        elif item.type == "float":
-            row.prop(item, "float", text="Value")
-        elif item.type == "vector3":
-            row.prop(item, "vector3_x", text="x")
-            row.prop(item, "vector3_y", text="y")
-            row.prop(item, "vector3_z", text="z")
-        elif item.type == "cuboid":
-            row.prop(item, "cuboid_x", text="x")
-            row.prop(item, "cuboid_y", text="y")
-            row.prop(item, "cuboid_z", text="z")
-            row = layout.row()
-            row.prop(item, "offset_x", text="x")
-            row.prop(item, "offset_y", text="y")
-            row.prop(item, "offset_z", text="z")
-        elif item.type == "sphere":
-            row.prop(item, "radius", text="Radius")
-            row = layout.row()
-            row.prop(item, "offset_x", text="x")
-            row.prop(item, "offset_y", text="y")
-            row.prop(item, "offset_z", text="z")
-        elif item.type == "capsule":
-            row.prop(item, "up_vector", text="Up Vector")
-            row = layout.row()
-            row.prop(item, "radius", text="Radius")
-            row.prop(item, "height", text="Height")
-            row = layout.row()
-            row.prop(item, "offset_x", text="x")
-            row.prop(item, "offset_y", text="y")
-            row.prop(item, "offset_z", text="z")
+        if not scene.bbu_validation_findings:
+            return
+
+        layout.label(text="Click a problem to select its objects")
+
+        row = layout.row()
+        row.template_list(
+            "BBU_FINDINGS_UL_List", "Collider Problems",
+            scene, "bbu_validation_findings", scene, "bbu_validation_index",
+        )
+
+
+class BBU_FINDINGS_UL_List(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+        if self.layout_type in {"DEFAULT", "COMPACT"}:
+            layout.label(text=item.message, icon=finding_icons[item.kind])
+        elif self.layout_type == "GRID":
+            layout.label(text="")
+
+
+def draw_id_collisions(layout, owner):
+    object_ids = id_index(owner)
+
+    if not object_ids.unique():
+        row = layout.row()
+        row.label(text="IDs must be unique! {}".format(object_ids.describe()), icon="ERROR")
+
+
+class BBU_POINTS_UL_List(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+        if self.layout_type in {"DEFAULT", "COMPACT"}:
+            layout.row().prop(item, "co", text="")
+        elif self.layout_type == "GRID":
+            layout.label(text="")
+
+
+def draw_item_values(layout, item, target):
+    row = layout.row()
+
+    if item.type == "string":
+        row.prop(item, "string", text="Value")
+    elif item.type == "bool":
+        row.prop(item, "bool", text="Value")
+    elif item.type == "integer":
+        row.prop(item, "integer", text="Value")
+    elif item.type == "float":
+        row.prop(item, "float", text="Value")
+    elif item.type == "vector3":
+        row.prop(item, "vector3_x", text="x")
+        row.prop(item, "vector3_y", text="y")
+        row.prop(item, "vector3_z", text="z")
+    elif item.type == "cuboid":
+        row.prop(item, "cuboid_x", text="x")
+        row.prop(item, "cuboid_y", text="y")
+        row.prop(item, "cuboid_z", text="z")
+        row = layout.row()
+        row.prop(item, "offset_x", text="x")
+        row.prop(item, "offset_y", text="y")
+        row.prop(item, "offset_z", text="z")
+    elif item.type == "sphere":
+        row.prop(item, "radius", text="Radius")
+        row = layout.row()
+        row.prop(item, "offset_x", text="x")
+        row.prop(item, "offset_y", text="y")
+        row.prop(item, "offset_z", text="z")
+    elif item.type == "capsule":
+        row.prop(item, "up_vector", text="Up Vector")
+        row = layout.row()
+        row.prop(item, "radius", text="Radius")
+        row.prop(item, "height", text="Height")
+        row = layout.row()
+        row.prop(item, "offset_x", text="x")
+        row.prop(item, "offset_y", text="y")
+        row.prop(item, "offset_z", text="z")
+    elif item.type == "convex_hull":
+        row.prop(item, "hull_vertices", text="Vertex Budget")
+    elif item.type == "vector3_array":
+        row.label(text="{} points".format(len(item.vector3_array)))
+        row = layout.row()
+        # only the rows scrolled into view are drawn, so large arrays stay responsive
+        row.template_list("BBU_POINTS_UL_List", "", item, "vector3_array", item, "vector3_array_index", rows=4)
+        row = layout.row()
+        row.operator("bbu_properties.add_point", text="Add at Cursor").target = target
+        row.operator("bbu_properties.remove_point", text="Remove").target = target
+        operator = row.operator("bbu_properties.remove_point", text="Clear")
+        operator.target = target
+        operator.all = True
+        row = layout.row()
+        row.operator("bbu_properties.points_from_mesh", text="From Selected Meshes").target = target
 
 
 classes = (
@@ -301,358 +1326,268 @@ classes = (
     BBU_PROPERTIES_OT_AddProperty,
     BBU_PROPERTIES_OT_RemoveProperty,
     BBU_PROPERTIES_OT_MoveProperty,
+    BBU_PROPERTIES_OT_CopyProperties,
+    BBU_PROPERTIES_OT_PasteProperties,
+    BBU_PROPERTIES_OT_CopyToSelected,
+    BBU_PROPERTIES_OT_ApplyToSelected,
+    BBU_PROPERTIES_OT_RemoveFromSelected,
+    BBU_PROPERTIES_OT_FitCollider,
+    BBU_PROPERTIES_OT_NewTemplate,
+    BBU_PROPERTIES_OT_LinkTemplate,
+    BBU_PROPERTIES_OT_AddPoint,
+    BBU_PROPERTIES_OT_RemovePoint,
+    BBU_PROPERTIES_OT_PointsFromMesh,
+    BBU_PROPERTIES_OT_ValidateColliders,
+    BBU_PROPERTIES_OT_LiveLink,
+    BBU_POINTS_UL_List,
+    BBU_FINDINGS_UL_List,
+    BBUPoint,
+    BBUFinding,
     BBUDataListItem,
     BBUPanel,
+    BBUTemplatePanel,
+    BBUValidationPanel,
 )
 
 
-def addon_path():
-    return os.path.dirname(os.path.realpath(__file__))
+def expanded_items(properties, blender_object, depsgraph, points_owner=None):
+    # copies of raw items with what blender doesn't keep in extras: convex hull items carry the hull of
+    # the object's evaluated mesh and, when points_owner is given, vector3 arrays carry flat points read
+    # from its items in bulk
+    expanded = []
+    for position, item in enumerate(properties):
+        item_type = converter.read_type(item)
 
+        if item_type == "vector3_array" and points_owner is not None:
+            item = dict(item)
+            item["vector3_array"] = arrays.item_points(points_owner.bbu_properties[position]).reshape(-1).tolist()
+        elif item_type == "convex_hull":
+            budget = item.get("hull_vertices", defaults["hull_vertices"])
+            _key, (vertices, triangles) = meshes.object_hull(blender_object, budget, depsgraph)
 
-def load_shader(file_name):
-    file = open(os.path.join(addon_path(), "shaders", file_name), 'r')
-    data = file.read()
-    file.close()
+            item = dict(item)
+            item["hull_points"] = vertices.reshape(-1).tolist()
+            item["hull_indices"] = triangles.reshape(-1).tolist()
 
-    return data
+        expanded.append(item)
 
+    return expanded
 
-vector3_shader = GPUShader(load_shader("vector3.vert"), load_shader("vector3.frag"))
-simple_color = GPUShader(load_shader("simple_color.vert"), load_shader("simple_color.frag"))
 
-draw_handler = None
+def object_data(obj, depsgraph):
+    # bbu_object_data of an object, converted like gather_node_hook does for the inline export format
+    properties = expanded_items([item_data(item) for item in obj.bbu_properties], obj, depsgraph)
+    items = converter.converted_items(properties)
 
+    if obj.bbu_template is not None:
+        template = [item_data(item) for item in obj.bbu_template.bbu_properties]
+        template = list(converter.converted_items(expanded_items(template, obj, depsgraph)))
+        items = converter.with_template(template, items)
 
-def draw():
-    obj = bpy.context.object
-    if obj is None:
-        return
-    if not hasattr(obj, "bbu_visualization"):
-        return
-    if not obj.bbu_visualization:
-        return
-    if not hasattr(obj, "bbu_properties"):
-        return
+    return {id: value for id, _item_type, value in items}
 
-    properties = obj.bbu_properties
 
-    vector3_pos = []
-    cuboid_pos = []
-    cuboid_indices = []
-    sphere_pos = []
-    capsule_pos = []
-
-    def parse_item(item):
-        if item.type == "vector3":
-            vector3_pos.append((item.vector3_x, item.vector3_y, item.vector3_z))
-        elif item.type == "cuboid":
-            hx = item.cuboid_x
-            hy = item.cuboid_y
-            hz = item.cuboid_z
-
-            # offsets
-            ox = item.offset_x
-            oy = item.offset_y
-            oz = item.offset_z
-
-            xn = ox - hx
-            xp = ox + hx
-            yn = oy - hy
-            yp = oy + hy
-            zn = oz - hz
-            zp = oz + hz
-
-            index = len(cuboid_pos)
-            cuboid_pos.extend((
-                (xn, yn, zn), (xp, yn, zn),
-                (xn, yp, zn), (xp, yp, zn),
-                (xn, yn, zp), (xp, yn, zp),
-                (xn, yp, zp), (xp, yp, zp),
-            ))
-            cuboid_indices.extend((
-                (index + 0, index + 1), (index + 0, index + 2), (index + 1, index + 3), (index + 2, index + 3),
-                (index + 4, index + 5), (index + 4, index + 6), (index + 5, index + 7), (index + 6, index + 7),
-                (index + 0, index + 4), (index + 1, index + 5), (index + 2, index + 6), (index + 3, index + 7),
-            ))
-        elif item.type == "sphere":
-            radius = item.radius
-
-            # offsets
-            ox = item.offset_x
-            oy = item.offset_y
-            oz = item.offset_z
-
-            segments = 60
-            deg = 360.0 / segments
-
-            last_deg = 0
-            next_deg = deg
-            for _ in range(segments):
-                ra = math.radians(last_deg)
-                rb = math.radians(next_deg)
-
-                a1 = math.sin(ra) * radius
-                a2 = math.cos(ra) * radius
-                b1 = math.sin(rb) * radius
-                b2 = math.cos(rb) * radius
-
-                sphere_pos.extend((
-                    (ox + a1, oy     , oz + a2),
-                    (ox + b1, oy     , oz + b2),
-                    (ox     , oy + a1, oz + a2),
-                    (ox     , oy + b1, oz + b2),
-                    (ox + a1, oy + a2, oz     ),
-                    (ox + b1, oy + b2, oz     ),
-                ))
+class glTF2ExportUserExtension:
+    def __init__(self):
+        from io_scene_gltf2.io.com.gltf2_io_extensions import Extension
+        self.Extension = Extension
+        self.shared_table = converter.SharedTable()
+        self.packed = None
+        self.packed_accessor = None
+        # template pointer -> converted items, each template is converted once per export
+        self.templates = {}
+        self.depsgraph = None
+
+    def template_items(self, template, blender_object):
+        key = template.as_pointer()
+
+        items = self.templates.get(key)
+        if items is None:
+            properties = [item_data(item) for item in template.bbu_properties]
+            if any(converter.read_type(item) == "convex_hull" for item in properties):
+                # hulls are of the object linking the template, so these are converted per object
+                expanded = expanded_items(properties, blender_object, self.evaluated_depsgraph())
+                return list(converter.converted_items(expanded))
+
+            items = list(converter.converted_items(properties))
+            self.templates[key] = items
+
+        return items
+
+    def evaluated_depsgraph(self):
+        if self.depsgraph is None:
+            self.depsgraph = bpy.context.evaluated_depsgraph_get()
+        return self.depsgraph
+
+    def packed_buffer(self):
+        if self.packed is not None:
+            return self.packed
+
+        from io_scene_gltf2.io.com import gltf2_io
+        from io_scene_gltf2.io.com.gltf2_io_constants import ComponentType, DataType
+        from io_scene_gltf2.io.exp.gltf2_io_binary_data import BinaryData
+
+        self.packed = converter.PackedBuffer()
+        # data and count are filled in gather_scene_hook, before the exporter writes buffers
+        self.packed_accessor = gltf2_io.Accessor(
+            buffer_view=BinaryData(b""),
+            byte_offset=None,
+            component_type=ComponentType.Float,
+            count=0,
+            extensions=None,
+            extras=None,
+            max=None,
+            min=None,
+            name=converter.PACKED_ACCESSOR_NAME,
+            normalized=None,
+            sparse=None,
+            type=DataType.Scalar,
+        )
 
-                last_deg += deg
-                next_deg += deg
-        elif item.type == "capsule":
-            radius = item.radius
-            height = item.height * 2.0
-            up_direction = item.up_vector
-
-            # offsets
-            ox = item.offset_x
-            oy = item.offset_y
-            oz = item.offset_z
-
-            segments = 60
-            deg = 360.0 / segments
-
-            last_deg = 0
-            next_deg = deg
-
-            d = height * 0.5 - radius
-
-            for _ in range(segments):
-                ra = math.radians(last_deg)
-                rb = math.radians(next_deg)
-
-                a1 = math.sin(ra) * radius
-                a2 = math.cos(ra) * radius
-                b1 = math.sin(rb) * radius
-                b2 = math.cos(rb) * radius
-
-                if up_direction == "zp":
-                    capsule_pos.extend((
-                        (ox + a1, oy + a2, oz + d),
-                        (ox + b1, oy + b2, oz + d),
-                        (ox + a1, oy + a2, oz - d),
-                        (ox + b1, oy + b2, oz - d),
-                    ))
-                    if last_deg % 90.0 == 0.0:
-                        capsule_pos.extend((
-                            (ox + a1, oy + a2, oz + d),
-                            (ox + a1, oy + a2, oz - d),
-                        ))
-
-                    dud = d if last_deg < 180.0 else -d
-
-                    capsule_pos.extend((
-                        (ox     , oy + a2, oz + dud + a1),
-                        (ox     , oy + b2, oz + dud + b1),
-                        (ox + a2, oy     , oz + dud + a1),
-                        (ox + b2, oy     , oz + dud + b1),
-                    ))
-                elif up_direction == "yp":
-                    capsule_pos.extend((
-                        (ox + a1, oy + d, oz + a2),
-                        (ox + b1, oy + d, oz + b2),
-                        (ox + a1, oy - d, oz + a2),
-                        (ox + b1, oy - d, oz + b2),
-                    ))
-
-                    if last_deg % 90.0 == 0.0:
-                        capsule_pos.extend((
-                            (ox + a1, oy + d, oz + a2),
-                            (ox + a1, oy - d, oz + a2),
-                        ))
-
-                    dud = d if last_deg < 180.0 else -d
-
-                    capsule_pos.extend((
-                        (ox     , oy + dud + a1, oz + a2),
-                        (ox     , oy + dud + b1, oz + b2),
-                        (ox + a2, oy + dud + a1, oz     ),
-                        (ox + b2, oy + dud + b1, oz     ),
-                    ))
-                elif up_direction == "xp":
-                    capsule_pos.extend((
-                        (ox + d, oy + a1, oz + a2),
-                        (ox + d, oy + b1, oz + b2),
-                        (ox - d, oy + a1, oz + a2),
-                        (ox - d, oy + b1, oz + b2),
-                    ))
-
-                    if last_deg % 90.0 == 0.0:
-                        capsule_pos.extend((
-                            (ox + d, oy + a1, oz + a2),
-                            (ox - d, oy + a1, oz + a2),
-                        ))
-
-                    dud = d if last_deg < 180.0 else -d
-
-                    capsule_pos.extend((
-                        (ox + dud + a1, oy     , oz + a2),
-                        (ox + dud + b1, oy     , oz + b2),
-                        (ox + dud + a1, oy + a2, oz     ),
-                        (ox + dud + b1, oy + b2, oz     ),
-                    ))
-
-                last_deg += deg
-                next_deg += deg
-
-    if obj.bbu_visualization_show_all:
-        for item in properties:
-            parse_item(item)
-    else:
-        parse_item(properties[obj.bbu_properties_index])
+        return self.packed
+
+    def gather_node_hook(self, gltf2_object, blender_object, _export_settings):
+        export_format = bpy.context.scene.bbu_export_format
+        extras = gltf2_object.extras
+
+        template = None
+        if blender_object is not None and getattr(blender_object, "bbu_template", None) is not None:
+            template = self.template_items(blender_object.bbu_template, blender_object)
+            if extras is None:
+                extras = gltf2_object.extras = {}
+
+        unique = True
+        if blender_object is not None and extras is not None and "bbu_properties" in extras:
+            index = id_index(blender_object)
+            unique = index.unique()
+            if not unique:
+                print("bevy_blender_utils: {} has duplicate ids, only the first is exported: {}".format(
+                    blender_object.name, index.describe(),
+                ))
 
-    transform = obj.matrix_world;
-    projection = bpy.context.region_data.perspective_matrix
+            extras["bbu_properties"] = expanded_items(
+                extras["bbu_properties"], blender_object, self.evaluated_depsgraph(), blender_object,
+            )
 
-    def draw_vector3():
-        if not vector3_pos:
+        if export_format == "BINARY":
+            if not converter.convert_extras(extras, self.packed_buffer(), unique, template):
+                return
+            if "bbu_object_packed" in extras:
+                # replaced with the accessor index by the exporter
+                extras["bbu_object_packed"]["accessor"] = self.packed_accessor
             return
 
-        vector3_shader.uniform_float("transform", transform)
-        vector3_shader.uniform_float("projection", projection)
-        vector3_shader.uniform_float("color", (0.6, 0.0, 0.8, 1.0))
-        batch = batch_for_shader(vector3_shader, "POINTS", {"pos": vector3_pos})
-        gpu.state.depth_test_set('LESS_EQUAL')
-        gpu.state.depth_mask_set(True)
-        batch.draw(vector3_shader)
-        gpu.state.depth_mask_set(False)
-
-    def draw_cuboid():
-        if not cuboid_pos:
+        if not converter.convert_extras(extras, unique=unique, template=template):
             return
 
-        simple_color.uniform_float("transform", transform)
-        simple_color.uniform_float("projection", projection)
-        simple_color.uniform_float("color", (0.4, 0.4, 0.8, 1.0))
-        batch = batch_for_shader(simple_color, "LINES", {"pos": cuboid_pos}, indices=cuboid_indices)
-        gpu.state.depth_test_set('LESS_EQUAL')
-        gpu.state.depth_mask_set(True)
-        batch.draw(simple_color)
-        gpu.state.depth_mask_set(False)
-
-    def draw_sphere():
-        if not sphere_pos:
+        if export_format == "SHARED":
+            self.shared_table.share_extras(extras)
+
+    def gather_scene_hook(self, gltf2_scene, _blender_scene, _export_settings):
+        gltf2_scene.extras = converter.strip_scene_extras(gltf2_scene.extras)
+
+        if self.packed_accessor is None:
             return
-        simple_color.uniform_float("transform", transform)
-        simple_color.uniform_float("projection", projection)
-        simple_color.uniform_float("color", (0.8, 0.2, 0.2, 1.0))
-        batch = batch_for_shader(simple_color, "LINES", {"pos": sphere_pos})
-        gpu.state.depth_test_set('LESS_EQUAL')
-        gpu.state.depth_mask_set(True)
-        batch.draw(simple_color)
-        gpu.state.depth_mask_set(False)
-
-    def draw_capsule():
-        if not capsule_pos:
+
+        self.packed_accessor.buffer_view.data = self.packed.tobytes()
+        self.packed_accessor.count = len(self.packed)
+
+    def gather_gltf_extensions_hook(self, gltf2_plan, _export_settings):
+        if not self.shared_table.table:
             return
 
-        simple_color.uniform_float("transform", transform)
-        simple_color.uniform_float("projection", projection)
-        simple_color.uniform_float("color", (0.2, 0.8, 0.2, 1.0))
-        batch = batch_for_shader(simple_color, "LINES", {"pos": capsule_pos})
-        gpu.state.depth_test_set('LESS_EQUAL')
-        gpu.state.depth_mask_set(True)
-        batch.draw(simple_color)
-        gpu.state.depth_mask_set(False)
+        for scene in gltf2_plan.scenes:
+            if not scene.nodes:
+                continue
 
-    draw_vector3()
-    draw_cuboid()
-    draw_sphere()
-    draw_capsule()
+            node = scene.nodes[0]
+            if isinstance(node, int):
+                node = gltf2_plan.nodes[node]
 
+            node.extras = self.shared_table.attach(node.extras)
 
-class glTF2ExportUserExtension:
+
+class glTF2ImportUserExtension:
     def __init__(self):
-        from io_scene_gltf2.io.com.gltf2_io_extensions import Extension
-        self.Extension = Extension
+        self.table = None
+        # accessor index -> floats of a packed buffer
+        self.packed = {}
+        # bbu_object_ref -> restored items, nodes sharing object data are restored once
+        self.restored = {}
+
+    def shared_table(self, gltf):
+        if self.table is None:
+            self.table = ()
+            for node in gltf.data.nodes or ():
+                if isinstance(node.extras, dict) and "bbu_object_table" in node.extras:
+                    self.table = node.extras["bbu_object_table"]
+                    break
+
+        return self.table
+
+    def packed_values(self, gltf, accessor):
+        values = self.packed.get(accessor)
+        if values is None:
+            from io_scene_gltf2.io.imp.gltf2_io_binary import BinaryData
+
+            values = BinaryData.get_data_from_accessor(gltf, accessor).reshape(-1).tolist()
+            self.packed[accessor] = values
+
+        return values
+
+    def restore(self, extras, gltf):
+        ref = extras.get("bbu_object_ref")
+        if ref in self.restored:
+            return self.restored[ref]
+
+        object_data = converter.node_object_data(
+            extras, self.shared_table(gltf), lambda accessor: self.packed_values(gltf, accessor),
+        )
+        restored = None if object_data is None else converter.restore_properties(object_data)
 
-    def gather_node_hook(self, gltf2_object, _blender_object, _export_settings):
-        if gltf2_object.extras is None:
-            return
-        if "bbu_properties" not in gltf2_object.extras:
+        if ref is not None:
+            self.restored[ref] = restored
+        return restored
+
+    def gather_import_node_after_hook(self, _vnode, gltf_node, blender_object, gltf):
+        extras = getattr(gltf_node, "extras", None)
+        if blender_object is None or not isinstance(extras, dict):
             return
 
-        properties = gltf2_object.extras["bbu_properties"]
+        # the importer copies extras into custom properties, object data is turned back into bbu_properties
+        for key in converter.object_data_extras:
+            del_if_exists(blender_object, key)
 
-        parsed = {}
+        restored = self.restore(extras, gltf)
+        if restored is None:
+            return
 
-        for item in properties:
-            def get_or_default(name):
-                return item[name] if name in item else defaults[name]
+        items, skipped = restored
+        if skipped:
+            print("bevy_blender_utils: {} has values no property type converts to, skipped: {}".format(
+                blender_object.name, ", ".join(skipped),
+            ))
 
-            def get_or_default_enum(lookup, name):
-                return lookup[item[name]][0] if name in item else defaults[name]
+        # one pass over the collection with raw writes, points are set in bulk
+        paste_properties(blender_object, items, "REPLACE")
 
-            def get_vector(name):
-                x = get_or_default("{}_x".format(name))
-                y = get_or_default("{}_y".format(name))
-                z = get_or_default("{}_z".format(name))
 
-                # convert to bevy coordinate system
-                return (x, z, y)
+@bpy.app.handlers.persistent
+def clear_id_indices(_arg=None):
+    ids.clear()
+    list_filter_cache.clear()
 
-            id = get_or_default("id")
 
-            if id == "":
-                continue
-            if id in parsed:
-                continue
+@bpy.app.handlers.persistent
+def migrate_on_load(_filepath=None):
+    migrate_data()
+
 
-            item_type = get_or_default_enum(item_types, "type")
-
-            if item_type == "string":
-                parsed[id] = get_or_default("string")
-            elif item_type == "bool":
-                parsed[id] = get_or_default("bool")
-            elif item_type == "integer":
-                parsed[id] = get_or_default("integer")
-            elif item_type == "float":
-                parsed[id] = get_or_default("float")
-            elif item_type == "vector3":
-                parsed[id] = get_vector("vector3")
-            elif item_type == "cuboid":
-                parsed[id] = {
-                    "cuboid": get_vector("cuboid"),
-                    "offset": get_vector("offset"),
-                }
-            elif item_type == "sphere":
-                parsed[id] = {
-                    "radius": get_or_default("radius"),
-                    "offset": get_vector("offset"),
-                }
-            elif item_type == "capsule":
-                up_vector = get_or_default_enum("up_vector")
-                bevy_up_vector = None
-
-                if up_vector == "xp":
-                    bevy_up_vector = (1, 0, 0)
-                elif up_vector == "yp":
-                    bevy_up_vector = (0, 0, 1)
-                elif up_vector == "zp":
-                    bevy_up_vector = (0, 1, 0)
-
-                parsed[id] = {
-                    "radius": get_or_default("radius"),
-                    "height": get_or_default("height"),
-                    "offset": get_vector("offset"),
-                    "up_vector": bevy_up_vector,
-                }
-
-        del_if_exists(gltf2_object.extras, "bbu_properties")
-        del_if_exists(gltf2_object.extras, "bbu_properties_index")
-        del_if_exists(gltf2_object.extras, "bbu_visualization")
-        del_if_exists(gltf2_object.extras, "bbu_visualization_show_all")
-
-        gltf2_object.extras["bbu_object_data"] = parsed
+id_index_handlers = (
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
 
 
 def register():
@@ -664,17 +1599,66 @@ def register():
     bpy.types.Object.bbu_properties_index = bpy.props.IntProperty(name="Property Index", default=0)
     bpy.types.Object.bbu_visualization = bpy.props.BoolProperty(default=True)
     bpy.types.Object.bbu_visualization_show_all = bpy.props.BoolProperty(default=True)
+    # templates are texts, so they are regular data-blocks that can be linked and appended between files
+    bpy.types.Text.bbu_properties = bpy.props.CollectionProperty(type=BBUDataListItem)
+    bpy.types.Text.bbu_properties_index = bpy.props.IntProperty(name="Property Index", default=0)
+    bpy.types.Object.bbu_template = bpy.props.PointerProperty(
+        name="Template",
+        description="Properties the object inherits, its own properties override them by id",
+        type=bpy.types.Text,
+    )
+    bpy.types.Scene.bbu_export_format = bpy.props.EnumProperty(
+        name="Export Format",
+        items=converter.export_formats,
+        default="INLINE",
+    )
 
-    global draw_handler
-    draw_handler = bpy.types.SpaceView3D.draw_handler_add(draw, (), "WINDOW", "POST_VIEW")
+    bpy.types.Scene.bbu_data_version = bpy.props.IntProperty(name="Data Version", default=0)
+
+    bpy.types.Scene.bbu_live_link_port = bpy.props.IntProperty(
+        name="Live Link Port",
+        description="Localhost port Bevy apps connect to for live property changes",
+        default=live_link.DEFAULT_PORT,
+        min=1024,
+        max=65535,
+    )
+
+    bpy.types.Scene.bbu_validation_findings = bpy.props.CollectionProperty(type=BBUFinding)
+    bpy.types.Scene.bbu_validation_index = bpy.props.IntProperty(
+        name="Finding Index",
+        default=-1,
+        update=select_finding,
+    )
+
+    for handlers in id_index_handlers:
+        handlers.append(clear_id_indices)
+    bpy.app.handlers.load_post.append(migrate_on_load)
+
+    viewport.register()
+    live_link.register()
 
 
 def unregister():
-    bpy.types.SpaceView3D.draw_handler_remove(draw_handler, "WINDOW")
+    live_link.unregister()
+    viewport.unregister()
+
+    for handlers in id_index_handlers:
+        handlers.remove(clear_id_indices)
+    bpy.app.handlers.load_post.remove(migrate_on_load)
+    clear_id_indices()
+
     del bpy.types.Object.bbu_properties
     del bpy.types.Object.bbu_properties_index
     del bpy.types.Object.bbu_visualization
     del bpy.types.Object.bbu_visualization_show_all
+    del bpy.types.Object.bbu_template
+    del bpy.types.Text.bbu_properties
+    del bpy.types.Text.bbu_properties_index
+    del bpy.types.Scene.bbu_export_format
+    del bpy.types.Scene.bbu_data_version
+    del bpy.types.Scene.bbu_live_link_port
+    del bpy.types.Scene.bbu_validation_findings
+    del bpy.types.Scene.bbu_validation_index
 
     from bpy.utils import unregister_class
     for cls in reversed(classes):
@@ -0,0 +1,28 @@
+# Point arrays of vector3_array items. Points are a collection of BBUPoint, always read and written in
+# bulk with foreach_get/foreach_set so large arrays don't go through python one point at a time.
+import numpy as np
+
+
+def item_points(item):
+    # (n, 3) float32 positions in blender coordinates
+    points = item.vector3_array
+    values = np.empty(len(points) * 3, dtype=np.float32)
+    points.foreach_get("co", values)
+
+    return values.reshape(-1, 3)
+
+
+def set_item_points(item, values):
+    # values are flat x, y, z triples or (n, 3) positions
+    values = np.asarray(values, dtype=np.float32).reshape(-1)
+    count = len(values) // 3
+
+    points = item.vector3_array
+    if len(points) > count:
+        points.clear()
+    for _index in range(count - len(points)):
+        points.add()
+
+    points.foreach_set("co", values[:count * 3])
+    item.vector3_array_index = min(item.vector3_array_index, count - 1) if count else 0
+
@@ -0,0 +1,288 @@
+# Headless batch export of .blend files to glTF. Run it with a regular python, it starts one
+# ``blender --background`` worker per file (up to one per core) that runs this same script to export
+# through the addon, and skips files whose source hash and addon version match the manifest:
+#   python bevy_blender_utils/batch_export.py assets/*.blend --output build/assets
+import argparse
+import ast
+import hashlib
+import json
+import os
+import struct
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_NAME = ".bbu_export_manifest.json"
+
+# command line format -> (glTF exporter format, file extension)
+output_formats = {
+    "glb": ("GLB", ".glb"),
+    "gltf": ("GLTF_SEPARATE", ".gltf"),
+}
+
+export_formats = ("INLINE", "SHARED", "BINARY")
+
+
+def addon_path():
+    return os.path.dirname(os.path.realpath(__file__))
+
+
+def hash_file(path, hasher=None):
+    hasher = hashlib.sha256() if hasher is None else hasher
+
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(chunk)
+
+    return hasher
+
+
+def addon_version():
+    # bl_info version and a hash of the addon sources, so exports are redone when the addon changes
+    # without a version bump
+    path = os.path.join(addon_path(), "__init__.py")
+    with open(path, "r") as file:
+        tree = ast.parse(file.read())
+
+    version = ()
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, "id", None) == "bl_info" for target in node.targets):
+            version = ast.literal_eval(node.value).get("version", ())
+
+    hasher = hashlib.sha256()
+    for root, dirs, files in os.walk(addon_path()):
+        dirs[:] = sorted(directory for directory in dirs if directory != "__pycache__")
+        for name in sorted(files):
+            if name.endswith((".py", ".vert", ".frag")):
+                hasher.update(name.encode())
+                hash_file(os.path.join(root, name), hasher)
+
+    return "{}+{}".format(".".join(str(part) for part in version), hasher.hexdigest()[:12])
+
+
+def count_nodes(path):
+    # reads the json of an exported .glb or .gltf, returns the number of nodes
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if data[:4] == b"glTF":
+        length, kind = struct.unpack_from("<I4s", data, 12)
+        if kind != b"JSON":
+            return 0
+        document = json.loads(data[20:20 + length])
+    else:
+        document = json.loads(data)
+
+    return len(document.get("nodes", ()))
+
+
+def output_size(path):
+    # size of an export including the buffers and images written next to a .gltf
+    size = os.path.getsize(path)
+
+    if path.endswith(".gltf"):
+        with open(path, "r") as file:
+            document = json.load(file)
+
+        directory = os.path.dirname(path)
+        for resource in document.get("buffers", []) + document.get("images", []):
+            uri = resource.get("uri", "")
+            resource_path = os.path.join(directory, uri)
+            if uri and not uri.startswith("data:") and os.path.exists(resource_path):
+                size += os.path.getsize(resource_path)
+
+    return size
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+    os.replace(temporary, path)
+
+
+def export_file(blender, source, output, arguments):
+    command = [
+        blender, "--background", "--factory-startup", source,
+        "--python-exit-code", "1",
+        "--python", os.path.realpath(__file__),
+        "--",
+        "--worker", output,
+        "--format", arguments.format,
+        "--export-format", arguments.export_format,
+    ]
+    if arguments.validate:
+        command.append("--validate")
+
+    # a stale export must not pass for a new one if the worker fails silently
+    if os.path.exists(output):
+        os.remove(output)
+
+    start = time.perf_counter()
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+
+    if process.returncode != 0 or not os.path.exists(output):
+        return elapsed, process.stdout
+
+    return elapsed, None
+
+
+def format_size(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024.0:
+            return "{:.1f} {}".format(size, unit)
+        size /= 1024.0
+
+    return "{:.1f} GiB".format(size)
+
+
+def output_paths(sources, output, extension):
+    # source -> export path. sources keep their directories relative to the directory they have in common,
+    # so files with the same name in different directories don't overwrite each other.
+    root = os.path.commonpath([os.path.dirname(source) for source in sources])
+
+    return {
+        source: os.path.normpath(os.path.join(
+            output,
+            os.path.relpath(os.path.dirname(source), root),
+            os.path.splitext(os.path.basename(source))[0] + extension,
+        ))
+        for source in sources
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export .blend files to glTF with bevy_blender_utils.")
+    parser.add_argument("sources", nargs="+", help=".blend files to export")
+    parser.add_argument("--output", required=True, help="directory exports are written into")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="blender executable")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="number of blender workers")
+    parser.add_argument("--format", choices=sorted(output_formats), default="glb")
+    parser.add_argument("--export-format", choices=export_formats, default="INLINE")
+    parser.add_argument("--force", action="store_true", help="export even if the manifest is up to date")
+    parser.add_argument("--validate", action="store_true", help="fail files whose colliders have problems")
+    arguments = parser.parse_args(argv)
+
+    os.makedirs(arguments.output, exist_ok=True)
+    manifest_path = os.path.join(arguments.output, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    version = addon_version()
+    extension = output_formats[arguments.format][1]
+
+    # the same file given twice is exported once
+    sources = list(dict.fromkeys(os.path.realpath(source) for source in arguments.sources))
+    try:
+        outputs = output_paths(sources, os.path.realpath(arguments.output), extension)
+    except ValueError:
+        parser.error("sources must be on the same drive")
+
+    start = time.perf_counter()
+    pending = []
+
+    for source in sources:
+        output = outputs[source]
+
+        entry = {
+            "hash": hash_file(source).hexdigest(),
+            "addon": version,
+            "format": arguments.format,
+            "export_format": arguments.export_format,
+            "validate": arguments.validate,
+            "output": output,
+        }
+
+        if not arguments.force and manifest.get(source) == entry and os.path.exists(output):
+            print("skipped {}: up to date".format(source))
+            continue
+
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        pending.append((source, output, entry))
+
+    failed = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, arguments.jobs)) as pool:
+        futures = [
+            (source, output, entry, pool.submit(export_file, arguments.blender, source, output, arguments))
+            for source, output, entry in pending
+        ]
+
+        for source, output, entry, future in futures:
+            elapsed, error = future.result()
+
+            if error is not None:
+                failed += 1
+                manifest.pop(source, None)
+                print("failed {} in {:.2f} s:\n{}".format(source, elapsed, error.strip()[-2000:]))
+                continue
+
+            manifest[source] = entry
+            print("exported {} in {:.2f} s: {} nodes, {}".format(
+                source, elapsed, count_nodes(output), format_size(output_size(output)),
+            ))
+
+    save_manifest(manifest_path, manifest)
+
+    print("{} exported, {} skipped, {} failed in {:.2f} s".format(
+        len(pending) - failed, len(sources) - len(pending), failed, time.perf_counter() - start,
+    ))
+
+    return 1 if failed else 0
+
+
+def worker(argv):
+    # runs inside blender, the .blend file is already open
+    import addon_utils
+    import bpy
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--worker", required=True)
+    parser.add_argument("--format", choices=sorted(output_formats), default="glb")
+    parser.add_argument("--export-format", choices=export_formats, default="INLINE")
+    parser.add_argument("--validate", action="store_true")
+    arguments = parser.parse_args(argv)
+
+    # the glTF exporter only picks up the user extension of an enabled addon
+    addon_name = os.path.basename(addon_path())
+    if addon_name not in bpy.context.preferences.addons:
+        sys.path.insert(0, os.path.dirname(addon_path()))
+        if addon_utils.enable(addon_name, default_set=True) is None:
+            raise RuntimeError("couldn't enable addon {}".format(addon_name))
+
+    if arguments.validate:
+        # problems are printed by the operator in background mode
+        bpy.ops.bbu_properties.validate_colliders(scope="SCENE")
+        problems = len(bpy.context.scene.bbu_validation_findings)
+        if problems:
+            raise RuntimeError("{} collider problems".format(problems))
+
+    for scene in bpy.data.scenes:
+        scene.bbu_export_format = arguments.export_format
+
+    bpy.ops.export_scene.gltf(
+        filepath=arguments.worker,
+        export_format=output_formats[arguments.format][0],
+        export_extras=True,
+    )
+
+
+if __name__ == "__main__":
+    try:
+        import bpy  # noqa: F401
+    except ImportError:
+        sys.exit(main())
+    else:
+        worker(sys.argv[sys.argv.index("--") + 1:])
@@ -0,0 +1,562 @@
+# Conversion of exported bbu_properties into bbu_object_data. This module doesn't depend on bpy, it works
+# on the plain dicts the glTF exporter puts into extras, where enums are stored as their item index.
+import json
+import sys
+from array import array
+
+item_types = [
+    ("string", "String", "String"),
+    ("bool", "Boolean", "Boolean"),
+    ("integer", "Integer", "Integer"),
+    ("float", "Float", "Float"),
+    ("vector3", "Vector3", "Vector3"),
+    ("cuboid", "Cuboid", "Cuboid"),
+    ("sphere", "Sphere", "Sphere"),
+    ("capsule", "Capsule", "Capsule"),
+    ("convex_hull", "Convex Hull", "Convex Hull"),
+    ("vector3_array", "Vector3 Array", "Vector3 Array"),
+]
+
+up_vectors = [
+    ("zp", "Z+", "Z+"),
+    ("yp", "Y+", "Y+"),
+    ("xp", "X+", "Z+"),
+]
+
+defaults = {
+    "id": "unnamed",
+    "type": "string",
+    "string": "",
+    "bool": False,
+    "integer": 0,
+    "float": 0.0,
+    "vector3_x": 0.0,
+    "vector3_y": 0.0,
+    "vector3_z": 0.0,
+    "offset_x": 0.0,
+    "offset_y": 0.0,
+    "offset_z": 0.0,
+    "cuboid_x": 0.5,
+    "cuboid_y": 0.5,
+    "cuboid_z": 0.5,
+    "radius": 0.5,
+    "height": 1.0,
+    "up_vector": "zp",
+    "hull_vertices": 32,
+    "vector3_array": (),
+}
+
+# item type -> stored fields that type uses besides id and type, everything else is stale
+item_fields = {
+    "string": ("string",),
+    "bool": ("bool",),
+    "integer": ("integer",),
+    "float": ("float",),
+    "vector3": ("vector3_x", "vector3_y", "vector3_z"),
+    "cuboid": ("cuboid_x", "cuboid_y", "cuboid_z", "offset_x", "offset_y", "offset_z"),
+    "sphere": ("radius", "offset_x", "offset_y", "offset_z"),
+    "capsule": ("radius", "height", "up_vector", "offset_x", "offset_y", "offset_z"),
+    "convex_hull": ("hull_vertices",),
+    "vector3_array": ("vector3_array", "vector3_array_index"),
+}
+
+stored_keys = {item_type: frozenset(("id", "type") + fields) for item_type, fields in item_fields.items()}
+
+
+def stale_fields(keys, item_type):
+    # stored keys an item of the given type doesn't use, left behind by older versions or type changes
+    used = stored_keys[item_type]
+    return [key for key in keys if key not in used]
+
+
+# up vectors in bevy coordinate system
+bevy_up_vectors = {
+    "xp": (1, 0, 0),
+    "yp": (0, 0, 1),
+    "zp": (0, 1, 0),
+}
+
+# extras written by blender for addon properties, none of them are meaningful to bevy
+addon_extras = (
+    "bbu_properties",
+    "bbu_properties_index",
+    "bbu_visualization",
+    "bbu_visualization_show_all",
+    "bbu_template",
+)
+
+
+def strip_scene_extras(extras):
+    # scene settings of the addon are stored as bbu_ prefixed scene properties, blender writes them into
+    # the extras of the glTF scene. returns None when nothing else is left.
+    if not extras:
+        return extras
+
+    for key in [key for key in extras if key.startswith("bbu_")]:
+        del extras[key]
+
+    return extras or None
+
+
+def value(name):
+    default = defaults[name]
+
+    def read(item):
+        return item.get(name, default)
+
+    return read
+
+
+def enum(lookup, name):
+    names = [entry[0] for entry in lookup]
+    default = defaults[name]
+
+    def read(item):
+        return names[item[name]] if name in item else default
+
+    return read
+
+
+def vector(name):
+    x = "{}_x".format(name)
+    y = "{}_y".format(name)
+    z = "{}_z".format(name)
+    dx = defaults[x]
+    dy = defaults[y]
+    dz = defaults[z]
+
+    def read(item):
+        # convert to bevy coordinate system
+        return (item.get(x, dx), item.get(z, dz), item.get(y, dy))
+
+    return read
+
+
+def vector_array(name):
+    default = defaults[name]
+
+    def read(item):
+        # flat x, y, z triples, converted to bevy coordinate system with slices so large arrays stay fast
+        values = list(item.get(name, default))
+        del values[len(values) - len(values) % 3:]
+
+        converted = values[:]
+        converted[1::3] = values[2::3]
+        converted[2::3] = values[1::3]
+        return converted
+
+    return read
+
+
+def up_vector():
+    read_enum = enum(up_vectors, "up_vector")
+
+    def read(item):
+        return bevy_up_vectors[read_enum(item)]
+
+    return read
+
+
+def hull():
+    # hulls aren't stored on items, the exporter adds the flat vertex positions and triangle indices of
+    # the object's hull as hull_points and hull_indices
+    def read(item):
+        points = item.get("hull_points", ())
+        indices = item.get("hull_indices", ())
+
+        # convert to bevy coordinate system, swapping y and z mirrors the hull so triangles are flipped
+        # to keep them counter-clockwise seen from outside
+        return {
+            "points": [(points[i], points[i + 2], points[i + 1]) for i in range(0, len(points), 3)],
+            "indices": [(indices[i], indices[i + 2], indices[i + 1]) for i in range(0, len(indices), 3)],
+        }
+
+    return read
+
+
+def record(**fields):
+    fields = tuple(fields.items())
+
+    def read(item):
+        return {key: read_field(item) for key, read_field in fields}
+
+    return read
+
+
+ZERO = (0.0, 0.0, 0.0)
+
+
+# item type -> converter of an item of that type
+converters = {
+    "string": value("string"),
+    "bool": value("bool"),
+    "integer": value("integer"),
+    "float": value("float"),
+    "vector3": vector("vector3"),
+    "cuboid": record(
+        cuboid=vector("cuboid"),
+        offset=vector("offset"),
+    ),
+    "sphere": record(
+        radius=value("radius"),
+        offset=vector("offset"),
+    ),
+    "capsule": record(
+        radius=value("radius"),
+        height=value("height"),
+        offset=vector("offset"),
+        up_vector=up_vector(),
+    ),
+    "convex_hull": hull(),
+    "vector3_array": vector_array("vector3_array"),
+}
+
+read_id = value("id")
+read_type = enum(item_types, "type")
+
+
+def converted_items(properties, unique=False):
+    # (id, item type, converted value) of every item, first item wins when ids collide and items
+    # without an id are skipped, unique tells that ids are known not to collide
+    seen = set()
+
+    for item in properties:
+        id = read_id(item)
+
+        if id == "":
+            continue
+        if not unique:
+            if id in seen:
+                continue
+            seen.add(id)
+
+        item_type = read_type(item)
+        yield id, item_type, converters[item_type](item)
+
+
+def convert_properties(properties, unique=False):
+    return {id: value for id, _item_type, value in converted_items(properties, unique)}
+
+
+def with_template(template, items):
+    # converted items of a template followed by the node's own items, which override template items
+    # with the same id
+    items = list(items)
+    overridden = {id for id, _item_type, _value in items}
+
+    return [entry for entry in template if entry[0] not in overridden] + items
+
+
+def convert_extras(extras, packed=None, unique=False, template=None):
+    # replaces addon properties of a node's extras with bbu_object_data, or with bbu_object_packed when
+    # a packed buffer is given, returns whether it did. template is the already converted items of the
+    # template the node links to.
+    if extras is None:
+        return False
+    if "bbu_properties" not in extras and template is None:
+        return False
+
+    properties = extras.get("bbu_properties", ())
+
+    for key in addon_extras:
+        if key in extras:
+            del extras[key]
+
+    items = converted_items(properties, unique)
+    if template is not None:
+        items = with_template(template, items)
+
+    if packed is None:
+        extras["bbu_object_data"] = {id: value for id, _item_type, value in items}
+    else:
+        packed.pack(extras, items)
+
+    return True
+
+
+# Importing reverses the conversion: converted values are turned back into raw items. Values don't keep
+# their item type, it is told apart by the shape of the value.
+
+# extras an imported node may carry instead of bbu_properties, depending on the export format
+object_data_extras = (
+    "bbu_object_data",
+    "bbu_object_ref",
+    "bbu_object_table",
+    "bbu_object_packed",
+)
+
+type_indices = {name: index for index, (name, _label, _description) in enumerate(item_types)}
+up_vector_indices = {bevy_up_vectors[name]: index for index, (name, _label, _description) in enumerate(up_vectors)}
+
+# record item type -> (keys its converted value always has, keys it may have)
+record_keys = {
+    "cuboid": ({"cuboid"}, {"offset"}),
+    "sphere": ({"radius"}, {"offset"}),
+    "capsule": ({"radius", "height", "up_vector"}, {"offset"}),
+    "convex_hull": ({"points", "indices"}, set()),
+}
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_numbers(value):
+    return isinstance(value, (list, tuple)) and all(is_number(entry) for entry in value)
+
+
+def restored_type(value):
+    # item type that converts to the value, None when none does
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "float"
+
+    if is_numbers(value):
+        # a vector3 array of a single point converts to the same value as a vector3
+        if len(value) == 3:
+            return "vector3"
+        if len(value) % 3 == 0:
+            return "vector3_array"
+        return None
+
+    if isinstance(value, dict):
+        keys = set(value)
+        for item_type, (required, allowed) in record_keys.items():
+            if required <= keys <= required | allowed:
+                return item_type
+
+    return None
+
+
+def unvector(name, value):
+    # converted back from bevy coordinate system
+    x, z, y = value
+    return {"{}_x".format(name): float(x), "{}_y".format(name): float(y), "{}_z".format(name): float(z)}
+
+
+def unswap_array(values):
+    # the y and z swap of vector_array is its own inverse
+    values = [float(entry) for entry in values]
+    swapped = values[:]
+    swapped[1::3] = values[2::3]
+    swapped[2::3] = values[1::3]
+    return swapped
+
+
+def unhull(value):
+    # hulls are computed from the object's mesh on export, only a vertex budget that fits the imported
+    # hull is kept
+    count = len(value["points"])
+    return {"hull_vertices": min(max(count, defaults["hull_vertices"]), 255)}
+
+
+# item type -> raw fields of an item converting to a value of that type
+restorers = {
+    "string": lambda value: {"string": value},
+    "bool": lambda value: {"bool": value},
+    "integer": lambda value: {"integer": value},
+    "float": lambda value: {"float": float(value)},
+    "vector3": lambda value: unvector("vector3", value),
+    "cuboid": lambda value: {
+        **unvector("cuboid", value["cuboid"]),
+        **unvector("offset", value.get("offset", ZERO)),
+    },
+    "sphere": lambda value: {
+        "radius": float(value["radius"]),
+        **unvector("offset", value.get("offset", ZERO)),
+    },
+    "capsule": lambda value: {
+        "radius": float(value["radius"]),
+        "height": float(value["height"]),
+        "up_vector": up_vector_indices[tuple(value["up_vector"])],
+        **unvector("offset", value.get("offset", ZERO)),
+    },
+    "convex_hull": unhull,
+    "vector3_array": lambda value: {"vector3_array": unswap_array(value)},
+}
+
+
+def restore_item(id, value):
+    # raw item converting to the value, None when no item does
+    item_type = restored_type(value)
+    if item_type is None:
+        return None
+
+    try:
+        fields = restorers[item_type](value)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    item = {"id": id, "type": type_indices[item_type]}
+    # like items edited in blender, values left at their default aren't stored
+    item.update((key, field) for key, field in fields.items() if field != defaults[key])
+    return item
+
+
+def restore_properties(object_data):
+    # (raw items, ids of values no item converts to) of a node's bbu_object_data
+    items = []
+    skipped = []
+
+    for id, value in object_data.items():
+        item = restore_item(id, value)
+        if item is None:
+            skipped.append(id)
+        else:
+            items.append(item)
+
+    return items, skipped
+
+
+def unpack_offset(values, start):
+    return {"offset": tuple(values[start:start + 3])}
+
+
+# item type -> (converted value, record length) of a packed record starting at an index
+unpacked_records = {
+    "float": lambda values, start: (values[start], 1),
+    "vector3": lambda values, start: (tuple(values[start:start + 3]), 3),
+    "cuboid": lambda values, start: (
+        {"cuboid": tuple(values[start:start + 3]), **unpack_offset(values, start + 3)}, 6,
+    ),
+    "sphere": lambda values, start: ({"radius": values[start], **unpack_offset(values, start + 1)}, 4),
+    "capsule": lambda values, start: ({
+        "radius": values[start],
+        "height": values[start + 1],
+        **unpack_offset(values, start + 2),
+        "up_vector": tuple(round(entry) for entry in values[start + 5:start + 8]),
+    }, 8),
+    "vector3_array": lambda values, start: (
+        values[start + 1:start + 1 + int(values[start]) * 3], 1 + int(values[start]) * 3,
+    ),
+}
+
+
+def unpack(packed, values):
+    # bbu_object_data of a node's bbu_object_packed, values are the floats of the packed buffer
+    data = dict(packed.get("data", {}))
+    start = packed["offset"]
+
+    for id, item_type in packed["fields"]:
+        data[id], length = unpacked_records[item_type](values, start)
+        start += length
+
+    return data
+
+
+def node_object_data(extras, table=(), packed_values=None):
+    # bbu_object_data of an imported node in any export format, None when it has none. table is the
+    # bbu_object_table of the file and packed_values(accessor) returns the floats of a packed buffer.
+    if "bbu_object_data" in extras:
+        return extras["bbu_object_data"]
+
+    ref = extras.get("bbu_object_ref")
+    if ref is not None:
+        return table[ref] if 0 <= ref < len(table) else None
+
+    packed = extras.get("bbu_object_packed")
+    if packed is not None and packed_values is not None and "accessor" in packed:
+        return unpack(packed, packed_values(packed["accessor"]))
+
+    return None
+
+
+def convert_nodes(nodes_extras):
+    # converts extras of many nodes in one pass, returns the number of converted nodes
+    converted = 0
+
+    for extras in nodes_extras:
+        if convert_extras(extras):
+            converted += 1
+
+    return converted
+
+
+export_formats = [
+    ("INLINE", "Inline", "Write bbu_object_data into the extras of every node"),
+    ("SHARED", "Shared", "Write every unique bbu_object_data once into a table and reference it from nodes"),
+    ("BINARY", "Binary", "Pack numeric bbu_object_data of every node into a single float buffer"),
+]
+
+
+class SharedTable:
+    # Unique converted property sets of an export. Nodes keep bbu_object_ref, an index into the table
+    # that is written into the extras of the first root node of every scene as bbu_object_table.
+    def __init__(self):
+        self.table = []
+        self.indices = {}
+
+    def add(self, parsed):
+        key = json.dumps(parsed, sort_keys=True, separators=(",", ":"))
+
+        index = self.indices.get(key)
+        if index is None:
+            index = len(self.table)
+            self.indices[key] = index
+            self.table.append(parsed)
+
+        return index
+
+    def share_extras(self, extras):
+        extras["bbu_object_ref"] = self.add(extras.pop("bbu_object_data"))
+
+    def attach(self, extras):
+        extras = {} if extras is None else extras
+        extras["bbu_object_table"] = self.table
+        return extras
+
+
+PACKED_ACCESSOR_NAME = "bbu_object_packed"
+
+# item type -> flat float record of a converted value, other types stay as json
+packed_records = {
+    "float": lambda value: (value,),
+    "vector3": lambda value: value,
+    "cuboid": lambda value: value["cuboid"] + value["offset"],
+    "sphere": lambda value: (value["radius"],) + value["offset"],
+    "capsule": lambda value: (value["radius"], value["height"]) + value["offset"] + value["up_vector"],
+    # point count followed by the points
+    "vector3_array": lambda value: [len(value) // 3] + value,
+}
+
+
+class PackedBuffer:
+    # Numeric values of every node packed into one float32 buffer. Nodes keep bbu_object_packed with the
+    # offset of their first record, the (id, item type) of each record and the rest of their data.
+    def __init__(self):
+        self.values = array("f")
+
+    def __len__(self):
+        return len(self.values)
+
+    def pack(self, extras, items):
+        offset = len(self.values)
+        data = {}
+        fields = []
+
+        for id, item_type, value in items:
+            record = packed_records.get(item_type)
+            if record is None:
+                data[id] = value
+                continue
+
+            fields.append((id, item_type))
+            self.values.extend(record(value))
+
+        if fields:
+            extras["bbu_object_packed"] = {"offset": offset, "fields": fields, "data": data}
+        else:
+            extras["bbu_object_data"] = data
+
+    def tobytes(self):
+        # gltf buffers are little endian
+        values = array("f", self.values)
+        if sys.byteorder == "big":
+            values.byteswap()
+
+        return values.tobytes()
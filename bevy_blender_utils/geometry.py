@@ -0,0 +1,569 @@
+# Wireframe generation for visualized primitives. This module doesn't depend on bpy, so it can be used
+# (and benchmarked) outside of Blender. Every generator returns a contiguous (N, 3) float32 array of
+# line list vertices that batch_for_shader accepts directly.
+from functools import lru_cache
+
+import numpy as np
+
+SEGMENTS = 60
+
+# quantized segment counts picked by level of detail, all multiples of 4 so capsules can use them
+LOD_LEVELS = (8, 12, 16, 24, 32, 48, 60, 96, 128)
+# approximate on-screen length of a single circle segment
+LOD_SEGMENT_PIXELS = 8.0
+
+# axis permutations that rotate z-up geometry onto the given up vector
+up_vector_axes = {
+    "zp": (0, 1, 2),
+    "yp": (0, 2, 1),
+    "xp": (2, 0, 1),
+}
+
+EMPTY = np.zeros((0, 3), dtype=np.float32)
+
+
+def _freeze(array):
+    array.setflags(write=False)
+    return array
+
+
+@lru_cache(maxsize=None)
+def unit_circle(segments=SEGMENTS):
+    angles = np.linspace(0.0, 2.0 * np.pi, segments + 1)
+    return _freeze(np.sin(angles)), _freeze(np.cos(angles))
+
+
+def _segments(first, second, zeros_at):
+    # builds (segments * 2, 3) line list vertices of a circle lying on the plane of two axes
+    count = len(first) - 1
+
+    lines = np.zeros((count, 2, 3))
+    axes = [axis for axis in range(3) if axis != zeros_at]
+
+    lines[:, 0, axes[0]] = first[:-1]
+    lines[:, 0, axes[1]] = second[:-1]
+    lines[:, 1, axes[0]] = first[1:]
+    lines[:, 1, axes[1]] = second[1:]
+
+    return lines.reshape(-1, 3)
+
+
+@lru_cache(maxsize=None)
+def unit_sphere(segments=SEGMENTS):
+    sin, cos = unit_circle(segments)
+
+    circle = np.concatenate((
+        _segments(sin, cos, zeros_at=1),
+        _segments(sin, cos, zeros_at=0),
+        _segments(sin, cos, zeros_at=2),
+    ))
+
+    return _freeze(circle), _freeze(np.zeros(len(circle)))
+
+
+@lru_cache(maxsize=None)
+def unit_capsule(segments=SEGMENTS):
+    # z-up capsule split into a unit radius part and a signed half-length part:
+    # position = circle * radius + (0, 0, cap * (height - radius))
+    if segments % 4 != 0:
+        raise ValueError("capsule segments must be a multiple of 4, got {}".format(segments))
+
+    sin, cos = unit_circle(segments)
+    half = segments // 2
+
+    ring = _segments(sin, cos, zeros_at=2)
+    ring_count = len(ring)
+
+    quadrants = np.array((
+        (0.0, 1.0, 0.0), (0.0, 1.0, 0.0),
+        (1.0, 0.0, 0.0), (1.0, 0.0, 0.0),
+        (0.0, -1.0, 0.0), (0.0, -1.0, 0.0),
+        (-1.0, 0.0, 0.0), (-1.0, 0.0, 0.0),
+    ))
+
+    # arcs are drawn with sin on the up axis, so the first half of the circle is the top hemisphere
+    arc_yz = _segments(cos, sin, zeros_at=0)
+    arc_xz = _segments(cos, sin, zeros_at=1)
+    arc_cap = np.repeat(np.where(np.arange(segments) < half, 1.0, -1.0), 2)
+
+    circle = np.concatenate((ring, ring, quadrants, arc_yz, arc_xz))
+    cap = np.concatenate((
+        np.ones(ring_count),
+        -np.ones(ring_count),
+        np.tile((1.0, -1.0), 4),
+        arc_cap,
+        arc_cap,
+    ))
+
+    return _freeze(circle), _freeze(cap)
+
+
+@lru_cache(maxsize=None)
+def unit_cuboid():
+    corners = np.array((
+        (-1.0, -1.0, -1.0), (1.0, -1.0, -1.0),
+        (-1.0, 1.0, -1.0), (1.0, 1.0, -1.0),
+        (-1.0, -1.0, 1.0), (1.0, -1.0, 1.0),
+        (-1.0, 1.0, 1.0), (1.0, 1.0, 1.0),
+    ))
+    edges = np.array((
+        (0, 1), (0, 2), (1, 3), (2, 3),
+        (4, 5), (4, 6), (5, 7), (6, 7),
+        (0, 4), (1, 5), (2, 6), (3, 7),
+    ))
+
+    return _freeze(corners[edges.reshape(-1)]), _freeze(np.zeros(len(edges) * 2))
+
+
+def unit_mesh(category, segments=SEGMENTS):
+    if category == "cuboid":
+        return unit_cuboid()
+    if category == "sphere":
+        return unit_sphere(segments)
+    if category == "capsule":
+        return unit_capsule(segments)
+
+    raise ValueError("no unit mesh for category {}".format(category))
+
+
+# An instance places a unit mesh with a 4x4 matrix and a stretch vector that is added to every vertex
+# scaled by its cap sign: position = matrix * vertex + cap * stretch. shaders/instanced_color.vert
+# does the same on the GPU.
+
+def _scale_offset(scale, offset):
+    matrix = np.identity(4)
+    matrix[:3, :3] = np.diag(np.broadcast_to(scale, 3))
+    matrix[:3, 3] = offset
+    return matrix
+
+
+def cuboid_instance(half_extents, offset):
+    return _scale_offset(half_extents, offset), np.zeros(3)
+
+
+def sphere_instance(radius, offset):
+    return _scale_offset(radius, offset), np.zeros(3)
+
+
+def capsule_instance(radius, height, up_vector, offset):
+    axes = np.identity(3)[list(up_vector_axes[up_vector])]
+
+    matrix = np.identity(4)
+    matrix[:3, :3] = axes * radius
+    matrix[:3, 3] = offset
+
+    return matrix, axes[:, 2] * (height - radius)
+
+
+def instance_lines(mesh, instance):
+    positions, cap = mesh
+    matrix, stretch = instance
+
+    lines = positions @ matrix[:3, :3].T + matrix[:3, 3] + np.outer(cap, stretch)
+    return lines.astype(np.float32)
+
+
+def cuboid_lines(half_extents, offset):
+    return instance_lines(unit_cuboid(), cuboid_instance(half_extents, offset))
+
+
+def sphere_lines(radius, offset, segments=SEGMENTS):
+    return instance_lines(unit_sphere(segments), sphere_instance(radius, offset))
+
+
+def capsule_lines(radius, height, up_vector, offset, segments=SEGMENTS):
+    return instance_lines(unit_capsule(segments), capsule_instance(radius, height, up_vector, offset))
+
+
+class Primitive:
+    # A single collider: its instance, its bounding sphere in local space and its line lists
+    # generated lazily per segment count.
+    def __init__(self, category, instance, radius):
+        self.category = category
+        self.instance = instance
+        self.center = instance[0][:3, 3]
+        self.radius = radius
+        self._lines = {}
+
+    def lines(self, segments=SEGMENTS):
+        lines = self._lines.get(segments)
+        if lines is None:
+            lines = instance_lines(unit_mesh(self.category, segments), self.instance)
+            self._lines[segments] = lines
+
+        return lines
+
+
+def cuboid(half_extents, offset):
+    radius = float(np.linalg.norm(half_extents))
+    return Primitive("cuboid", cuboid_instance(half_extents, offset), radius)
+
+
+def sphere(radius, offset):
+    return Primitive("sphere", sphere_instance(radius, offset), abs(radius))
+
+
+def capsule(radius, height, up_vector, offset):
+    extent = abs(height - radius) + abs(radius)
+    return Primitive("capsule", capsule_instance(radius, height, up_vector, offset), extent)
+
+
+def bounds(primitives):
+    if not primitives:
+        return np.zeros((0, 3)), np.zeros(0)
+
+    centers = np.stack([primitive.center for primitive in primitives])
+    radii = np.array([primitive.radius for primitive in primitives])
+    return centers, radii
+
+
+def transform_bounds(centers, radii, matrix):
+    matrix = np.asarray(matrix, dtype=np.float64).reshape(4, 4)
+    scale = np.linalg.norm(matrix[:3, :3], axis=0).max()
+    return centers @ matrix[:3, :3].T + matrix[:3, 3], radii * scale
+
+
+def _round_to_level(value):
+    return max(4, int(round(value / 4.0)) * 4)
+
+
+def lod_segments(centers, radii, perspective_matrix, viewport_size, minimum=LOD_LEVELS[0], maximum=SEGMENTS):
+    # picks a segment count per world space bounding sphere from its projected radius in pixels
+    if not len(centers):
+        return np.zeros(0, dtype=int)
+
+    perspective = np.asarray(perspective_matrix, dtype=np.float64).reshape(4, 4)
+    width, height = viewport_size
+
+    focal = 0.5 * max(
+        np.linalg.norm(perspective[0, :3]) * width,
+        np.linalg.norm(perspective[1, :3]) * height,
+    )
+    w = centers @ perspective[3, :3] + perspective[3, 3]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pixels = np.where(w > 1e-6, radii * focal / w, np.inf)
+
+    target = 2.0 * np.pi * pixels / LOD_SEGMENT_PIXELS
+
+    levels = np.asarray(LOD_LEVELS)
+    segments = levels[np.minimum(np.searchsorted(levels, target), len(levels) - 1)]
+
+    return np.clip(segments, _round_to_level(minimum), _round_to_level(maximum))
+
+
+def frustum_planes(perspective_matrix):
+    # (6, 4) normalized plane equations of the view frustum, pointing inwards
+    perspective = np.asarray(perspective_matrix, dtype=np.float64).reshape(4, 4)
+
+    planes = np.array((
+        perspective[3] + perspective[0],
+        perspective[3] - perspective[0],
+        perspective[3] + perspective[1],
+        perspective[3] - perspective[1],
+        perspective[3] + perspective[2],
+        perspective[3] - perspective[2],
+    ))
+
+    return planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+
+
+def in_frustum(centers, radii, planes):
+    # mask of bounding spheres that are at least partially inside the frustum
+    if not len(centers):
+        return np.zeros(0, dtype=bool)
+
+    distances = centers @ planes[:, :3].T + planes[:, 3]
+    return np.all(distances >= -radii[:, None], axis=1)
+
+
+# Collider fitting, points are (n, 3) object space vertex positions.
+
+# axis of the z-up capsule mesh -> up vector name
+axis_up_vectors = {0: "xp", 1: "yp", 2: "zp"}
+
+# directions whose extremal points seed the bounding sphere
+_sphere_directions = np.array((
+    (1, 0, 0), (0, 1, 0), (0, 0, 1),
+    (1, 1, 1), (1, 1, -1), (1, -1, 1), (1, -1, -1),
+    (1, 1, 0), (1, -1, 0), (1, 0, 1), (1, 0, -1), (0, 1, 1), (0, 1, -1),
+), dtype=np.float64)
+
+
+def fit_cuboid(points):
+    # axis aligned bounding box, returns (half extents, center)
+    lower = points.min(axis=0)
+    upper = points.max(axis=0)
+    return (upper - lower) / 2.0, (upper + lower) / 2.0
+
+
+def fit_sphere(points, iterations=32):
+    # near minimal bounding sphere, returns (radius, center). The sphere is fitted to the extremal points
+    # along a few directions and then grown until it contains every point.
+    projections = points @ _sphere_directions.T
+    extremal = points[np.concatenate((projections.argmin(axis=0), projections.argmax(axis=0)))]
+
+    center = extremal.mean(axis=0)
+    best = (np.inf, center)
+    for iteration in range(iterations):
+        distances = ((extremal - center) ** 2).sum(axis=1)
+        farthest = distances.argmax()
+        if distances[farthest] < best[0]:
+            best = (distances[farthest], center)
+        center = center + (extremal[farthest] - center) / (iteration + 2)
+
+    radius, center = np.sqrt(best[0]), best[1]
+
+    while True:
+        distances = ((points - center) ** 2).sum(axis=1)
+        farthest = distances.argmax()
+        distance = np.sqrt(distances[farthest])
+        if distance <= radius * (1.0 + 1e-6):
+            break
+
+        # smallest sphere containing the current one and the farthest point
+        grown = (radius + distance) / 2.0
+        center = center + (points[farthest] - center) * ((grown - radius) / distance)
+        radius = grown
+
+    return float(radius), center
+
+
+def fit_capsule(points):
+    # capsule along the axis closest to the principal axis of the points, returns
+    # (radius, height, up vector, center) where height is measured from the center to a tip
+    _half_extents, center = fit_cuboid(points)
+    centered = points - center
+
+    if len(points) > 1:
+        _values, vectors = np.linalg.eigh(np.cov(centered, rowvar=False))
+        axis = int(np.abs(vectors[:, -1]).argmax())
+    else:
+        axis = 2
+
+    along = centered[:, axis]
+    across = np.delete(centered, axis, axis=1)
+
+    squared = (across ** 2).sum(axis=1)
+    radius = float(np.sqrt(squared.max()))
+
+    # the straight part is long enough that every point is inside a hemisphere or the cylinder
+    reach = np.abs(along) - np.sqrt(np.maximum(radius ** 2 - squared, 0.0))
+    height = radius + max(0.0, float(reach.max()))
+
+    return radius, height, axis_up_vectors[axis], center
+
+
+# Convex hulls are simplified to a vertex budget: their vertices are the support points of the mesh along
+# evenly spread directions, every support point is a vertex of the true hull.
+
+HULL_CHUNK = 4096
+# directions per budgeted vertex searched for support points
+HULL_DIRECTIONS = 8
+HULL_MAX_DIRECTIONS = 1024
+
+
+def sphere_directions(count):
+    # fibonacci sphere
+    indices = np.arange(count) + 0.5
+    polar = np.arccos(1.0 - 2.0 * indices / count)
+    azimuth = np.pi * (1.0 + 5.0 ** 0.5) * indices
+
+    return np.stack((
+        np.cos(azimuth) * np.sin(polar),
+        np.sin(azimuth) * np.sin(polar),
+        np.cos(polar),
+    ), axis=1)
+
+
+def extreme_points(points, directions):
+    # distinct points that are the farthest along any of the directions, chunked so dense meshes don't
+    # need a (directions, n) matrix
+    extremes = np.empty((0, 3))
+    for start in range(0, len(points), HULL_CHUNK):
+        chunk = np.concatenate((extremes, points[start:start + HULL_CHUNK]))
+        extremes = chunk[np.unique((directions @ chunk.T).argmax(axis=1))]
+
+    return extremes
+
+
+def support_points(points, budget):
+    # up to budget support points, picked along as few directions as possible so they stay evenly spread
+    directions = min(budget * HULL_DIRECTIONS, HULL_MAX_DIRECTIONS)
+    extremes = extreme_points(points, sphere_directions(directions))
+    if len(extremes) <= budget:
+        return extremes
+
+    count = budget
+    while True:
+        chosen = extreme_points(extremes, sphere_directions(count))
+        if len(chosen) >= budget or count >= directions:
+            return chosen[:budget]
+        count *= 2
+
+
+def hull_triangles(points):
+    # incremental convex hull of a few points, triangles wind counter-clockwise seen from outside
+    if len(points) < 4:
+        return np.zeros((0, 3), dtype=int)
+
+    epsilon = 1e-9 * max(1.0, float(np.abs(points).max()))
+
+    first = 0
+    second = int(((points - points[first]) ** 2).sum(axis=1).argmax())
+    line = points[second] - points[first]
+    third = int((np.cross(points - points[first], line) ** 2).sum(axis=1).argmax())
+    normal = np.cross(line, points[third] - points[first])
+    heights = (points - points[first]) @ normal
+    fourth = int(np.abs(heights).argmax())
+
+    if abs(heights[fourth]) <= epsilon * np.linalg.norm(normal):
+        # flat, there is no volume to wrap
+        return np.zeros((0, 3), dtype=int)
+
+    if heights[fourth] > 0:
+        second, third = third, second
+
+    faces = [(first, second, third), (first, fourth, second), (second, fourth, third), (third, fourth, first)]
+
+    def plane(face):
+        a, b, c = (points[index] for index in face)
+        normal = np.cross(b - a, c - a)
+        normal /= np.linalg.norm(normal)
+        return normal, float(normal @ a)
+
+    planes = [plane(face) for face in faces]
+
+    for index in range(len(points)):
+        if index in (first, second, third, fourth):
+            continue
+
+        normals = np.array([normal for normal, _offset in planes])
+        offsets = np.array([offset for _normal, offset in planes])
+        visible = normals @ points[index] - offsets > epsilon
+        if not visible.any():
+            continue
+
+        edges = set()
+        for face, seen in zip(faces, visible):
+            if seen:
+                a, b, c = face
+                edges.update(((a, b), (b, c), (c, a)))
+
+        faces = [face for face, seen in zip(faces, visible) if not seen]
+        planes = [entry for entry, seen in zip(planes, visible) if not seen]
+
+        for a, b in edges:
+            if (b, a) not in edges:
+                faces.append((a, b, index))
+                planes.append(plane((a, b, index)))
+
+    return np.array(faces, dtype=int)
+
+
+def convex_hull(points, budget):
+    # (vertices, triangles) of a hull with at most budget vertices, triangles index into vertices
+    candidates = support_points(np.asarray(points, dtype=np.float64), budget)
+    triangles = hull_triangles(candidates)
+
+    used, triangles = np.unique(triangles, return_inverse=True)
+    return candidates[used], triangles.reshape(-1, 3)
+
+
+class Hull(Primitive):
+    # A convex hull collider, its lines don't depend on the segment count.
+    def __init__(self, vertices, triangles):
+        lower = vertices.min(axis=0) if len(vertices) else np.zeros(3)
+        upper = vertices.max(axis=0) if len(vertices) else np.zeros(3)
+
+        self.category = "convex_hull"
+        self.instance = None
+        self.center = (lower + upper) / 2.0
+        self.radius = float(np.linalg.norm(upper - lower) / 2.0)
+        self.vertices = vertices
+        self.triangles = triangles
+
+        edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+        edges = np.unique(np.sort(edges, axis=1), axis=0)
+        self._hull_lines = vertices[edges.reshape(-1)].astype(np.float32) if len(edges) else EMPTY
+
+    def lines(self, segments=SEGMENTS):
+        return self._hull_lines
+
+
+class Instances:
+    def __init__(self, matrices, stretches):
+        # (n, 4, 4) and (n, 3)
+        self.matrices = matrices
+        self.stretches = stretches
+        self._uniforms = None
+
+    def __len__(self):
+        return len(self.matrices)
+
+    @staticmethod
+    def build(instances):
+        if not instances:
+            return EMPTY_INSTANCES
+
+        matrices, stretches = zip(*instances)
+        return Instances(np.stack(matrices), np.stack(stretches))
+
+    def transformed(self, matrix):
+        if not len(self):
+            return self
+
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(4, 4)
+        return Instances(matrix @ self.matrices, self.stretches @ matrix[:3, :3].T)
+
+    def uniforms(self):
+        # column-major mat4 and vec4 arrays, laid out as glsl expects them
+        if self._uniforms is None:
+            count = len(self)
+
+            matrices = np.ascontiguousarray(self.matrices.transpose(0, 2, 1), dtype=np.float32)
+            stretches = np.zeros((count, 4), dtype=np.float32)
+            stretches[:, :3] = self.stretches
+
+            self._uniforms = (matrices.reshape(count, 16), stretches)
+
+        return self._uniforms
+
+    def lines(self, mesh):
+        # cpu equivalent of drawing the instances, used by the fallback path
+        positions, cap = mesh
+        if not len(self):
+            return EMPTY
+
+        lines = (
+            np.einsum("nij,vj->nvi", self.matrices[:, :3, :3], positions)
+            + self.matrices[:, None, :3, 3]
+            + cap[None, :, None] * self.stretches[:, None, :]
+        )
+        return lines.reshape(-1, 3).astype(np.float32)
+
+
+EMPTY_INSTANCES = Instances(np.zeros((0, 4, 4)), np.zeros((0, 3)))
+
+
+def points(positions):
+    if not positions:
+        return EMPTY
+    return np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+
+
+def concatenate(arrays):
+    if not arrays:
+        return EMPTY
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.concatenate(arrays)
+
+
+def transform(positions, matrix):
+    if not len(positions):
+        return EMPTY
+
+    matrix = np.asarray(matrix, dtype=np.float64).reshape(4, 4)
+    lines = positions @ matrix[:3, :3].T + matrix[:3, 3]
+    return lines.astype(np.float32)
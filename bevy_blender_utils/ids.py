@@ -0,0 +1,90 @@
+# Per-object index of property ids, kept up to date by the id update callback and the list operators
+# so uniqueness can be checked without walking the properties. This module doesn't depend on bpy.
+
+
+class IdIndex:
+    def __init__(self, ids=()):
+        self.ids = list(ids)
+        self.counts = {}
+        # number of ids used by more than one entry
+        self.duplicates = 0
+        # bumped on every change to the entries, so views of them (like list filters) can be cached
+        self.version = 0
+        self._collisions = None
+
+        for id in self.ids:
+            self._count(id, 1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _count(self, id, change):
+        count = self.counts.get(id, 0) + change
+
+        if count == 2 and change > 0:
+            self.duplicates += 1
+        elif count == 1 and change < 0:
+            self.duplicates -= 1
+
+        if count:
+            self.counts[id] = count
+        else:
+            del self.counts[id]
+
+        self.touch()
+
+    def touch(self):
+        # marks a change that doesn't affect ids, like an entry's type
+        self.version += 1
+        self._collisions = None
+
+    def set(self, position, id):
+        previous = self.ids[position]
+        if previous == id:
+            return
+
+        self._count(previous, -1)
+        self._count(id, 1)
+        self.ids[position] = id
+
+    def insert(self, position, id):
+        self.ids.insert(position, id)
+        self._count(id, 1)
+
+    def remove(self, position):
+        self._count(self.ids.pop(position), -1)
+
+    def move(self, source, target):
+        # same as CollectionProperty.move
+        self.ids.insert(target, self.ids.pop(source))
+        self.touch()
+
+    def unique(self):
+        return self.duplicates == 0
+
+    def collisions(self):
+        # colliding id -> positions of its entries
+        if self._collisions is None:
+            collisions = {}
+            if self.duplicates:
+                for position, id in enumerate(self.ids):
+                    if self.counts[id] > 1:
+                        collisions.setdefault(id, []).append(position)
+
+            self._collisions = collisions
+
+        return self._collisions
+
+    def describe(self):
+        return ", ".join(
+            "\"{}\" ({})".format(id, ", ".join(str(position + 1) for position in positions))
+            for id, positions in self.collisions().items()
+        )
+
+
+# object pointer -> IdIndex
+indices = {}
+
+
+def clear():
+    indices.clear()
@@ -0,0 +1,374 @@
+# Live link: streams the converted bbu_properties of edited objects to running Bevy apps over a localhost
+# socket, so tweaks show up in the game without an export. Messages are newline separated json:
+#   {"reset": true, "objects": {name: {"set": {id: value}}}}  everything, sent to a client when it connects
+#   {"objects": {name: {"set": {id: value}, "remove": [id]}}}  changed values since the previous message
+# Objects that were deleted or renamed away have every id they were sent removed.
+# Values are converted exactly like the inline export format writes bbu_object_data.
+import json
+import socket
+import time
+
+import bpy
+
+from . import viewport
+
+DEFAULT_PORT = 7878
+# seconds between polls of the socket and of pending changes
+POLL_INTERVAL = 0.01
+# changes are sent once edits pause for this long...
+DEBOUNCE = 0.03
+# ...or once the oldest unsent change is this old, so a slider drag keeps streaming
+MAX_DELAY = 0.1
+# clients that don't read for this long are dropped instead of stalling blender
+SEND_TIMEOUT = 1.0
+
+
+def encode(value):
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+
+class LiveLink:
+    # Listening socket, connected clients and the values they were last sent. object_data(obj, depsgraph)
+    # returns the converted object data of an object.
+    def __init__(self, port, object_data):
+        self.object_data = object_data
+        self.clients = []
+        # object name -> {id: encoded value} of what clients have
+        self.sent = {}
+        # object name -> pointer and pointer -> object name of the sent objects, deletions and renames are told
+        # from them without going through every object
+        self.pointers = {}
+        self.names = {}
+        # names of objects changed since the last message
+        self.pending = set()
+        # whether sent objects may have been deleted since the last message
+        self.check_removed = False
+        self.first_change = None
+        self.last_change = None
+
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.server.bind(("127.0.0.1", port))
+            self.server.listen()
+        except OSError:
+            self.server.close()
+            raise
+        self.server.setblocking(False)
+
+        self.snapshot()
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        self.clients.clear()
+        self.server.close()
+
+    def touch(self):
+        now = time.perf_counter()
+        if not self.dirty():
+            self.first_change = now
+        self.last_change = now
+
+    def dirty(self):
+        return bool(self.pending) or self.check_removed
+
+    def mark(self, name):
+        self.touch()
+        self.pending.add(name)
+
+    def mark_removed(self):
+        # names that were sent are checked against their objects on the next message
+        if not self.sent:
+            return
+        self.touch()
+        self.check_removed = True
+
+    def renamed(self, obj):
+        # name obj was sent under when it has been renamed since, None otherwise
+        previous = self.names.get(obj.as_pointer())
+        if previous is None or previous == obj.name:
+            return None
+        return previous
+
+    def mark_all(self):
+        self.mark_removed()
+        for obj in linked_objects():
+            self.mark(obj.name)
+
+    def current(self, names):
+        # {name: object data} of the objects that still exist, their pointers are remembered
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        current = {}
+
+        for name in names:
+            obj = bpy.data.objects.get(name)
+            if obj is not None:
+                current[name] = self.object_data(obj, depsgraph)
+                self.remember(name, obj.as_pointer())
+
+        return current
+
+    def remember(self, name, pointer):
+        previous = self.pointers.get(name)
+        if previous == pointer:
+            return
+
+        self.forget(name)
+        self.pointers[name] = pointer
+        self.names[pointer] = name
+
+    def forget(self, name):
+        pointer = self.pointers.pop(name, None)
+        # the pointer may already be remembered under the name its object was renamed to
+        if self.names.get(pointer) == name:
+            del self.names[pointer]
+
+    def deleted(self):
+        # names of sent objects that no longer exist, or that another object took over
+        deleted = []
+        for name, pointer in self.pointers.items():
+            obj = bpy.data.objects.get(name)
+            if obj is None or obj.as_pointer() != pointer:
+                deleted.append(name)
+
+        return deleted
+
+    def snapshot(self):
+        # what a newly connected client is sent, also what later changes are compared against
+        self.pointers.clear()
+        self.names.clear()
+        current = self.current([obj.name for obj in linked_objects()])
+        self.sent = {name: {id: encode(value) for id, value in data.items()} for name, data in current.items()}
+        self.pending.clear()
+        self.check_removed = False
+
+        return {"reset": True, "objects": {name: {"set": data} for name, data in current.items()}}
+
+    def changes(self):
+        # {name: {"set": ..., "remove": ...}} of the pending objects whose values differ from what was sent,
+        # and of the sent objects that are gone
+        objects = {}
+        names = set(self.pending)
+        if self.check_removed:
+            names.update(self.deleted())
+        current = self.current(names)
+
+        for name in names:
+            if name in current:
+                continue
+            self.forget(name)
+            previous = self.sent.pop(name, None)
+            if previous:
+                objects[name] = {"set": {}, "remove": list(previous)}
+
+        for name, data in current.items():
+            previous = self.sent.get(name, {})
+            encoded = {id: encode(value) for id, value in data.items()}
+            # objects without properties that were never sent aren't tracked
+            if not encoded and name not in self.sent:
+                self.forget(name)
+                continue
+
+            changed = {id: data[id] for id, text in encoded.items() if previous.get(id) != text}
+            removed = [id for id in previous if id not in encoded]
+            self.sent[name] = encoded
+
+            if changed or removed:
+                objects[name] = {"set": changed, "remove": removed}
+
+        self.pending.clear()
+        self.check_removed = False
+        return objects
+
+    def send(self, clients, message):
+        data = (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+        for client in clients:
+            try:
+                client.settimeout(SEND_TIMEOUT)
+                client.sendall(data)
+                client.setblocking(False)
+            except OSError:
+                self.drop(client)
+
+    def drop(self, client):
+        client.close()
+        if client in self.clients:
+            self.clients.remove(client)
+
+    def accept(self):
+        while True:
+            try:
+                client, _address = self.server.accept()
+            except BlockingIOError:
+                return
+
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client.setblocking(False)
+            self.clients.append(client)
+
+            # pending changes go to the others first, so the snapshot and what they have agree
+            self.flush()
+            self.send([client], self.snapshot())
+
+    def prune(self):
+        # clients don't send anything, a readable client has closed its end
+        for client in list(self.clients):
+            try:
+                if client.recv(4096) == b"":
+                    self.drop(client)
+            except BlockingIOError:
+                pass
+            except OSError:
+                self.drop(client)
+
+    def flush(self):
+        if not self.dirty():
+            return
+
+        objects = self.changes()
+        if objects and self.clients:
+            self.send(list(self.clients), {"objects": objects})
+
+    def due(self, now):
+        if not self.dirty():
+            return False
+        return now - self.last_change >= DEBOUNCE or now - self.first_change >= MAX_DELAY
+
+    def poll(self):
+        self.accept()
+        self.prune()
+
+        if self.due(time.perf_counter()):
+            self.flush()
+
+
+def linked_objects():
+    return [obj for obj in bpy.data.objects if obj.bbu_properties or obj.bbu_template is not None]
+
+
+link = None
+
+
+def running():
+    return link is not None
+
+
+def start(port, object_data):
+    global link
+    if link is None:
+        link = LiveLink(port, object_data)
+    if not bpy.app.timers.is_registered(poll):
+        bpy.app.timers.register(poll, first_interval=0.0, persistent=True)
+
+    return link
+
+
+def stop():
+    global link
+    if link is not None:
+        link.close()
+        link = None
+
+
+def poll():
+    if link is None:
+        return None
+
+    link.poll()
+    return POLL_INTERVAL
+
+
+def mark_owner(owner):
+    # an object or a template text whose properties changed
+    if link is None:
+        return
+
+    if isinstance(owner, bpy.types.Text):
+        for obj in bpy.data.objects:
+            if obj.bbu_template == owner:
+                link.mark(obj.name)
+    else:
+        link.mark(owner.name)
+
+
+@bpy.app.handlers.persistent
+def track_updates(_scene, depsgraph):
+    if link is None:
+        return
+
+    for update in depsgraph.updates:
+        # deleting objects updates the collections they were in
+        if isinstance(update.id, bpy.types.Collection):
+            link.mark_removed()
+            continue
+        if not isinstance(update.id, bpy.types.Object):
+            continue
+
+        obj = update.id.original
+        # clients drop the name a renamed object was sent under and get it under the new one
+        previous = link.renamed(obj)
+        if previous is not None:
+            link.mark(previous)
+            link.mark(obj.name)
+
+        # transforms aren't part of the properties, geometry is for convex hulls
+        if not update.is_updated_transform or update.is_updated_geometry:
+            link.mark(obj.name)
+
+
+@bpy.app.handlers.persistent
+def track_undo(_scene=None, _depsgraph=None):
+    if link is not None:
+        link.mark_all()
+
+
+@bpy.app.handlers.persistent
+def on_load(_filepath=None):
+    # everything changed, clients start over from a new snapshot
+    if link is None:
+        return
+
+    link.send(list(link.clients), link.snapshot())
+    subscribe()
+
+
+msgbus_owner = object()
+
+
+def on_property_changed():
+    # item edits are marked by their update callbacks
+    obj = bpy.context.object
+    if obj is not None:
+        mark_owner(obj)
+
+
+def subscribe():
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+
+    for key in viewport.subscription_keys():
+        bpy.msgbus.subscribe_rna(key=key, owner=msgbus_owner, args=(), notify=on_property_changed)
+
+
+update_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, track_updates),
+    (bpy.app.handlers.undo_post, track_undo),
+    (bpy.app.handlers.redo_post, track_undo),
+    (bpy.app.handlers.load_post, on_load),
+)
+
+
+def register():
+    subscribe()
+
+    for handlers, handler in update_handlers:
+        handlers.append(handler)
+
+
+def unregister():
+    stop()
+
+    for handlers, handler in update_handlers:
+        handlers.remove(handler)
+    bpy.msgbus.clear_by_owner(msgbus_owner)
@@ -0,0 +1,130 @@
+# Mesh data of objects for properties derived from geometry, like fitted colliders and convex hulls.
+import hashlib
+
+import numpy as np
+
+from . import geometry
+
+
+def evaluated_points(obj, depsgraph):
+    # object space vertex positions of the evaluated mesh, None for objects without geometry
+    evaluated = obj.evaluated_get(depsgraph)
+    try:
+        mesh = evaluated.to_mesh()
+    except RuntimeError:
+        return None
+    if mesh is None:
+        return None
+
+    points = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", points)
+    evaluated.to_mesh_clear()
+
+    if not len(points):
+        return None
+    return points.reshape(-1, 3).astype(np.float64)
+
+
+def points_hash(points):
+    return hashlib.blake2b(np.ascontiguousarray(points).tobytes(), digest_size=16).hexdigest()
+
+
+# Hulls are keyed by what the evaluated mesh depends on and a version that geometry updates bump, so a
+# cache hit needs neither the mesh nor its vertices. Objects sharing a mesh without modifiers are hulled once.
+
+# geometry key -> version
+geometry_versions = {}
+# bumped when geometry may have changed without an update, like on frame changes and undo
+epoch = 0
+
+# (geometry key, version, epoch, vertex budget) -> (vertices, triangles)
+hull_cache = {}
+
+# hulls of edited meshes pile up, the cache is dropped when it grows past this
+HULL_CACHE_LIMIT = 256
+
+EMPTY_HULL = (np.zeros((0, 3)), np.zeros((0, 3), dtype=int))
+
+# (object pointer, vertex budget) -> (key, hull) last computed for an object, drawn until its current hull is
+latest_hulls = {}
+# (object pointer, vertex budget) -> object name, hulls the viewport asked for that aren't computed yet
+pending_hulls = {}
+
+
+def geometry_key(obj):
+    # the mesh of the object, or the object itself when modifiers make its evaluated mesh its own
+    if obj.data is None or len(obj.modifiers):
+        return obj.as_pointer()
+    return obj.data.as_pointer()
+
+
+def geometry_updated(key):
+    geometry_versions[key] = geometry_versions.get(key, 0) + 1
+
+
+def invalidate():
+    global epoch
+    epoch += 1
+
+
+def hull_key(obj, budget):
+    key = geometry_key(obj)
+    return key, geometry_versions.get(key, 0), epoch, budget
+
+
+def object_hull(obj, budget, depsgraph):
+    # (cache key, (vertices, triangles)) of the hull of an object's evaluated mesh in object space,
+    # computed when it isn't cached
+    key = hull_key(obj, budget)
+
+    hull = hull_cache.get(key)
+    if hull is None:
+        points = evaluated_points(obj, depsgraph)
+        hull = EMPTY_HULL if points is None else geometry.convex_hull(points, budget)
+
+        if len(hull_cache) >= HULL_CACHE_LIMIT:
+            hull_cache.clear()
+        hull_cache[key] = hull
+
+    latest_hulls[(obj.as_pointer(), budget)] = (key, hull)
+    return key, hull
+
+
+def cached_hull(obj, budget):
+    # (cache key, (vertices, triangles)) without touching the mesh, for the draw path. a hull that isn't
+    # computed yet is queued for compute_pending and the object's previous hull is returned meanwhile,
+    # with a None key when there is none.
+    key = hull_key(obj, budget)
+
+    hull = hull_cache.get(key)
+    if hull is not None:
+        return key, hull
+
+    pending_hulls[(obj.as_pointer(), budget)] = obj.name
+    return latest_hulls.get((obj.as_pointer(), budget), (None, EMPTY_HULL))
+
+
+def compute_pending(objects, depsgraph):
+    # computes queued hulls, returns the pointers of the objects whose hulls were computed
+    pending = list(pending_hulls.items())
+    pending_hulls.clear()
+
+    computed = set()
+    for (pointer, budget), name in pending:
+        obj = objects.get(name)
+        if obj is None or obj.as_pointer() != pointer:
+            continue
+
+        object_hull(obj, budget, depsgraph)
+        computed.add(pointer)
+
+    return computed
+
+
+def clear():
+    global epoch
+    hull_cache.clear()
+    latest_hulls.clear()
+    pending_hulls.clear()
+    geometry_versions.clear()
+    epoch = 0
@@ -0,0 +1,66 @@
+# Lazily compiled shader programs. Sources are read once and programs are compiled on first use, so
+# enabling the addon and running it in background mode (where there is no gpu context) stay cheap.
+import os
+
+import bpy
+
+# name -> (vertex file, fragment file, source prepended to the vertex shader)
+definitions = {}
+# file name -> source
+sources = {}
+# name -> compiled program, or None if it can't be compiled in this session
+compiled = {}
+
+
+def addon_path():
+    return os.path.dirname(os.path.realpath(__file__))
+
+
+def load_shader(file_name):
+    data = sources.get(file_name)
+    if data is not None:
+        return data
+
+    file = open(os.path.join(addon_path(), "shaders", file_name), 'r')
+    data = file.read()
+    file.close()
+
+    sources[file_name] = data
+    return data
+
+
+def define(name, vertex, fragment, prefix=""):
+    definitions[name] = (vertex, fragment, prefix)
+    compiled.pop(name, None)
+
+
+def has_gpu():
+    return not bpy.app.background
+
+
+def get(name):
+    if name in compiled:
+        return compiled[name]
+
+    program = None
+
+    if has_gpu():
+        from gpu.types import GPUShader
+
+        vertex, fragment, prefix = definitions[name]
+        try:
+            program = GPUShader(prefix + load_shader(vertex), load_shader(fragment))
+        except Exception as error:
+            print("bevy_blender_utils: couldn't compile shader {}: {}".format(name, error))
+
+    compiled[name] = program
+    return program
+
+
+def clear():
+    compiled.clear()
+    sources.clear()
+
+
+define("vector3", "vector3.vert", "vector3.frag")
+define("simple_color", "simple_color.vert", "simple_color.frag")
@@ -0,0 +1,14 @@
+uniform mat4 transform;
+uniform mat4 projection;
+
+// INSTANCE_CHUNK is defined by the addon when the shader is compiled
+uniform mat4 instances[INSTANCE_CHUNK];
+uniform vec4 stretches[INSTANCE_CHUNK];
+
+in vec3 pos;
+in float cap;
+
+void main() {
+    vec4 local = instances[gl_InstanceID] * vec4(pos, 1.0) + vec4(stretches[gl_InstanceID].xyz * cap, 0.0);
+    gl_Position = projection * transform * local;
+}
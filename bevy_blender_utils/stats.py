@@ -0,0 +1,91 @@
+# Draw instrumentation. This module doesn't depend on bpy, the viewport feeds it one Sample per redraw
+# while instrumentation is enabled and the overlay or scripts read the rolling summary back.
+import time
+from collections import deque
+
+phases = ("generate", "batch", "submit")
+
+WINDOW = 240
+
+
+class Sample:
+    __slots__ = ("start", "last", "times", "primitives", "vertices", "draw_calls")
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.times = {}
+        self.primitives = {}
+        self.vertices = {}
+        self.draw_calls = 0
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.times[phase] = now - self.last
+        self.last = now
+
+    def count(self, category, primitives, vertices):
+        self.primitives[category] = self.primitives.get(category, 0) + primitives
+        self.vertices[category] = self.vertices.get(category, 0) + vertices
+
+    def finish(self):
+        self.times["total"] = self.last - self.start
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class DrawStats:
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+
+    def begin(self):
+        return Sample()
+
+    def end(self, sample):
+        sample.finish()
+        self.samples.append(sample)
+
+    def clear(self):
+        self.samples.clear()
+
+    def timings(self, phase):
+        # milliseconds of the given phase over the rolling window
+        ordered = sorted(sample.times.get(phase, 0.0) * 1000.0 for sample in self.samples)
+
+        return {
+            "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+            "p50": percentile(ordered, 0.5),
+            "p95": percentile(ordered, 0.95),
+            "max": ordered[-1] if ordered else 0.0,
+        }
+
+    def summary(self):
+        last = self.samples[-1] if self.samples else Sample()
+
+        return {
+            "frames": len(self.samples),
+            "times": {phase: self.timings(phase) for phase in phases + ("total",)},
+            "primitives": dict(last.primitives),
+            "vertices": dict(last.vertices),
+            "draw_calls": last.draw_calls,
+        }
+
+    def lines(self):
+        summary = self.summary()
+
+        lines = ["bbu draw: {} frames, {} draw calls".format(summary["frames"], summary["draw_calls"])]
+        for phase, timing in summary["times"].items():
+            lines.append("{}: {:.3f} ms avg, {:.3f} p50, {:.3f} p95, {:.3f} max".format(
+                phase, timing["mean"], timing["p50"], timing["p95"], timing["max"],
+            ))
+        for category, primitives in summary["primitives"].items():
+            lines.append("{}: {} primitives, {} vertices".format(
+                category, primitives, summary["vertices"].get(category, 0),
+            ))
+
+        return lines
@@ -0,0 +1,380 @@
+# Scene-wide collider validation. This module doesn't depend on bpy, colliders are given in world space
+# and checked for degenerate dimensions, overlaps and colliders that sit inside others. A spatial hash over
+# their bounds keeps the exact tests to pairs whose bounds overlap.
+import itertools
+import math
+
+import numpy as np
+
+# penetration below this is treated as touching
+TOLERANCE = 1e-4
+# narrow phase iterations before a pair that hasn't been separated is treated as touching
+GJK_ITERATIONS = 64
+# colliders spanning more hash cells than this are tested against every collider by their bounds instead
+LARGE_CELLS = 64
+
+
+class Collider:
+    # A convex collider: the convex hull of its core points grown by radius. Spheres and capsules have a
+    # point and a segment as core, cuboids and hulls have their vertices and the planes of their faces.
+    def __init__(self, owner, id, kind, points, radius=0.0, planes=None):
+        self.owner = owner
+        self.id = id
+        self.kind = kind
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.radius = float(radius)
+        # (normals, offsets) with outward unit normals, a point is inside when normals @ p <= offsets
+        self.planes = planes
+        self.problems = []
+
+        self.lower = self.points.min(axis=0) - self.radius
+        self.upper = self.points.max(axis=0) + self.radius
+        self._vertices = [tuple(point) for point in self.points.tolist()]
+
+    def __repr__(self):
+        return "{}.{}".format(self.owner, self.id)
+
+    def support(self, direction):
+        # farthest point of the collider along direction
+        x, y, z = direction
+        if len(self._vertices) > 16:
+            index = int(np.argmax(self.points @ direction))
+            px, py, pz = self._vertices[index]
+        else:
+            px, py, pz = max(self._vertices, key=lambda point: point[0] * x + point[1] * y + point[2] * z)
+
+        if self.radius:
+            scale = self.radius / math.sqrt(x * x + y * y + z * z)
+            return px + x * scale, py + y * scale, pz + z * scale
+
+        return px, py, pz
+
+    def depth(self, point):
+        # how far a point is inside the collider, negative outside. exact inside, which is all containment
+        # needs
+        if self.planes is not None:
+            normals, offsets = self.planes
+            return float(np.min(offsets - normals @ point))
+
+        return self.radius - core_distance(self.points, point)
+
+
+def core_distance(core, point):
+    # distance from a point to a point or segment core
+    if len(core) == 1:
+        return float(np.linalg.norm(point - core[0]))
+
+    start, end = core
+    line = end - start
+    length = float(line @ line)
+    along = 0.0 if length == 0.0 else min(1.0, max(0.0, float((point - start) @ line) / length))
+    return float(np.linalg.norm(point - (start + line * along)))
+
+
+def box_planes(center, axes):
+    # planes of the parallelepiped center + axes @ [-1, 1]^3, axes are its half edge vectors as columns
+    inverse = np.linalg.inv(axes)
+    lengths = np.linalg.norm(inverse, axis=1)
+    normals = inverse / lengths[:, None]
+    offsets = normals @ center
+
+    return np.concatenate((normals, -normals)), np.concatenate((offsets + 1.0 / lengths, 1.0 / lengths - offsets))
+
+
+def hull_planes(points, triangles):
+    # planes of a hull's triangles, flipped to face away from its centroid so mirroring transforms don't
+    # turn them inside out
+    a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+    normals = np.cross(b - a, c - a)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    offsets = (normals * a).sum(axis=1)
+
+    flip = normals @ points.mean(axis=0) > offsets
+    normals[flip] *= -1.0
+    offsets[flip] *= -1.0
+
+    return normals, offsets
+
+
+def _scale(matrix):
+    # largest scale of a transform, radii of spheres and capsules are scaled by it
+    return float(np.linalg.norm(matrix[:3, :3], axis=0).max())
+
+
+def _point(matrix, point):
+    return matrix[:3, :3] @ np.asarray(point, dtype=np.float64) + matrix[:3, 3]
+
+
+# Collider constructors take an object's world matrix and the item's values in object space. Each one
+# notes dimensions that can't be exported or drawn as intended in problems.
+
+def cuboid(owner, id, matrix, half_extents, offset):
+    half_extents = np.asarray(half_extents, dtype=np.float64)
+    center = _point(matrix, offset)
+    axes = matrix[:3, :3] @ np.diag(half_extents)
+
+    corners = np.array(list(itertools.product((-1.0, 1.0), repeat=3)))
+    problems = []
+    if (half_extents <= 0.0).any():
+        problems.append("cuboid has a size of {:.3g} x {:.3g} x {:.3g}".format(*(half_extents * 2.0)))
+    elif abs(np.linalg.det(axes)) < 1e-12:
+        problems.append("cuboid is flattened by the object's scale")
+
+    collider = Collider(owner, id, "cuboid", center + corners @ axes.T)
+    collider.problems = problems
+    if not problems:
+        collider.planes = box_planes(center, axes)
+
+    return collider
+
+
+def sphere(owner, id, matrix, radius, offset):
+    collider = Collider(owner, id, "sphere", [_point(matrix, offset)], abs(radius) * _scale(matrix))
+
+    if radius <= 0.0:
+        collider.problems.append("sphere radius is {:.3g}".format(radius))
+    elif collider.radius <= 0.0:
+        collider.problems.append("sphere is flattened by the object's scale")
+
+    return collider
+
+
+def capsule(owner, id, matrix, radius, height, up_axis, offset):
+    # height is the distance from the center to the tip of a cap, the caps' centers are height - radius
+    # from the center
+    up_axis = np.asarray(up_axis, dtype=np.float64)
+    offset = np.asarray(offset, dtype=np.float64)
+    half = up_axis * max(height - radius, 0.0)
+
+    collider = Collider(
+        owner, id, "capsule",
+        [_point(matrix, offset - half), _point(matrix, offset + half)],
+        abs(radius) * _scale(matrix),
+    )
+
+    if radius <= 0.0:
+        collider.problems.append("capsule radius is {:.3g}".format(radius))
+    elif height < radius:
+        collider.problems.append(
+            "capsule height {:.3g} is smaller than its radius {:.3g}, it is drawn inverted".format(height, radius)
+        )
+    elif collider.radius <= 0.0:
+        collider.problems.append("capsule is flattened by the object's scale")
+
+    return collider
+
+
+def hull(owner, id, matrix, vertices, triangles):
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    points = vertices @ matrix[:3, :3].T + matrix[:3, 3] if len(vertices) else matrix[None, :3, 3]
+    collider = Collider(owner, id, "convex_hull", points)
+
+    if len(triangles) < 4:
+        collider.problems.append("convex hull has no volume, the object's mesh is flat or empty")
+    elif abs(np.linalg.det(matrix[:3, :3])) < 1e-12:
+        collider.problems.append("convex hull is flattened by the object's scale")
+    else:
+        collider.planes = hull_planes(points, np.asarray(triangles))
+
+    return collider
+
+
+# GJK intersection test on the minkowski difference of two colliders, vectors are plain tuples since
+# numpy is slower than python for a handful of 3d vectors
+
+def _sub(a, b):
+    return a[0] - b[0], a[1] - b[1], a[2] - b[2]
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross(a, b):
+    return a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]
+
+
+def _neg(a):
+    return -a[0], -a[1], -a[2]
+
+
+def _towards_origin(edge, to_origin):
+    # direction perpendicular to an edge, pointing at the origin
+    return _cross(_cross(edge, to_origin), edge)
+
+
+def _line(simplex):
+    a, b = simplex
+    ab = _sub(b, a)
+    ao = _neg(a)
+
+    if _dot(ab, ao) > 0.0:
+        return [a, b], _towards_origin(ab, ao)
+    return [a], ao
+
+
+def _triangle(simplex):
+    a, b, c = simplex
+    ab = _sub(b, a)
+    ac = _sub(c, a)
+    ao = _neg(a)
+    abc = _cross(ab, ac)
+
+    if _dot(_cross(abc, ac), ao) > 0.0:
+        if _dot(ac, ao) > 0.0:
+            return [a, c], _towards_origin(ac, ao)
+        return _line([a, b])
+
+    if _dot(_cross(ab, abc), ao) > 0.0:
+        return _line([a, b])
+
+    if _dot(abc, ao) > 0.0:
+        return [a, b, c], abc
+    return [a, c, b], _neg(abc)
+
+
+def _tetrahedron(simplex):
+    a, b, c, d = simplex
+    ab = _sub(b, a)
+    ac = _sub(c, a)
+    ad = _sub(d, a)
+    ao = _neg(a)
+
+    if _dot(_cross(ab, ac), ao) > 0.0:
+        return _triangle([a, b, c])
+    if _dot(_cross(ac, ad), ao) > 0.0:
+        return _triangle([a, c, d])
+    if _dot(_cross(ad, ab), ao) > 0.0:
+        return _triangle([a, d, b])
+
+    return None, None
+
+
+_simplex_cases = {2: _line, 3: _triangle, 4: _tetrahedron}
+
+
+def intersecting(first, second, tolerance=TOLERANCE):
+    # whether two colliders overlap by more than tolerance
+    direction = tuple(((first.lower + first.upper) - (second.lower + second.upper)).tolist())
+    if _dot(direction, direction) == 0.0:
+        direction = (1.0, 0.0, 0.0)
+
+    simplex = [_sub(first.support(direction), second.support(_neg(direction)))]
+    direction = _neg(simplex[0])
+
+    for _iteration in range(GJK_ITERATIONS):
+        length = math.sqrt(_dot(direction, direction))
+        if length < 1e-12:
+            # the origin is on the simplex, past the first support point it is between points that reach
+            # beyond it
+            return len(simplex) > 1
+
+        point = _sub(first.support(direction), second.support(_neg(direction)))
+        if _dot(point, direction) <= tolerance * length:
+            return False
+
+        simplex, direction = _simplex_cases[len(simplex) + 1]([point] + simplex)
+        if simplex is None:
+            return True
+
+    return False
+
+
+def inside(inner, outer, tolerance=TOLERANCE):
+    # whether inner is entirely inside outer, exact since outer is convex: the core points of inner are at
+    # least its radius deep
+    if outer.planes is None and outer.kind not in ("sphere", "capsule"):
+        return False
+
+    return all(outer.depth(point) >= inner.radius - tolerance for point in inner.points)
+
+
+def candidate_pairs(colliders):
+    # (i, j) of colliders with overlapping bounds, i < j, from a spatial hash over their bounds
+    count = len(colliders)
+    if count < 2:
+        return np.zeros((0, 2), dtype=int)
+
+    lower = np.array([collider.lower for collider in colliders])
+    upper = np.array([collider.upper for collider in colliders])
+
+    # most colliders span one or two cells per axis
+    extents = (upper - lower).max(axis=1)
+    cell = max(float(np.median(extents)) * 2.0, 1e-6)
+
+    first = np.floor(lower / cell).astype(np.int64)
+    last = np.floor(upper / cell).astype(np.int64)
+    spans = (last - first + 1).prod(axis=1)
+
+    cells = {}
+    large = []
+    for index in range(count):
+        if spans[index] > LARGE_CELLS:
+            large.append(index)
+            continue
+
+        ranges = (range(first[index, axis], last[index, axis] + 1) for axis in range(3))
+        for key in itertools.product(*ranges):
+            cells.setdefault(key, []).append(index)
+
+    pairs = set()
+    for members in cells.values():
+        if len(members) > 1:
+            pairs.update(itertools.combinations(members, 2))
+
+    pairs = np.array(sorted(pairs), dtype=int).reshape(-1, 2)
+
+    # large colliders are checked against everything by their bounds
+    for index in large:
+        others = np.flatnonzero(((lower <= upper[index]) & (upper >= lower[index])).all(axis=1))
+        others = others[others != index]
+        extra = np.stack((np.minimum(others, index), np.maximum(others, index)), axis=1)
+        pairs = np.concatenate((pairs, extra))
+
+    if not len(pairs):
+        return pairs
+
+    pairs = np.unique(pairs, axis=0)
+    overlap = ((lower[pairs[:, 0]] <= upper[pairs[:, 1]]) & (upper[pairs[:, 0]] >= lower[pairs[:, 1]])).all(axis=1)
+    return pairs[overlap]
+
+
+class Finding:
+    # A problem found by validate, colliders are the ones involved in it.
+    __slots__ = ("kind", "message", "colliders")
+
+    def __init__(self, kind, message, colliders):
+        self.kind = kind
+        self.message = message
+        self.colliders = colliders
+
+    def __repr__(self):
+        return "{}: {}".format(self.kind, self.message)
+
+
+def validate(colliders, tolerance=TOLERANCE):
+    # findings of every collider, colliders of the same owner are expected to overlap and aren't compared
+    findings = []
+    valid = []
+
+    for collider in colliders:
+        for problem in collider.problems:
+            findings.append(Finding("DEGENERATE", "{}: {}".format(collider, problem), (collider,)))
+        valid.append(not collider.problems)
+
+    for i, j in candidate_pairs(colliders).tolist():
+        first = colliders[i]
+        second = colliders[j]
+        if first.owner == second.owner or not (valid[i] and valid[j]):
+            continue
+        if not intersecting(first, second, tolerance):
+            continue
+
+        if inside(first, second, tolerance):
+            findings.append(Finding("CONTAINED", "{} is inside {}".format(first, second), (first, second)))
+        elif inside(second, first, tolerance):
+            findings.append(Finding("CONTAINED", "{} is inside {}".format(second, first), (second, first)))
+        else:
+            findings.append(Finding("OVERLAP", "{} overlaps {}".format(first, second), (first, second)))
+
+    return findings
@@ -0,0 +1,954 @@
+import operator
+
+import numpy as np
+import blf
+import bpy
+import gpu
+from gpu_extras.batch import batch_for_shader
+from mathutils import Matrix
+
+from . import arrays, geometry, meshes, programs, stats
+
+visualization_modes = [
+    ("ACTIVE", "Active", "Visualize the active object"),
+    ("SELECTED", "Selected", "Visualize all selected objects in a single merged draw"),
+    ("VISIBLE", "Visible", "Visualize all visible objects in a single merged draw"),
+]
+
+categories = ("vector3", "cuboid", "sphere", "capsule", "convex_hull")
+instanced_categories = ("cuboid", "sphere", "capsule")
+# categories drawn as line lists when not instanced, hulls always are
+line_categories = instanced_categories + ("convex_hull",)
+
+# instances uploaded per draw call, bounded by the minimum uniform storage of a vertex shader
+INSTANCE_CHUNK = 32
+
+category_colors = {
+    "vector3": (0.6, 0.0, 0.8, 1.0),
+    "cuboid": (0.4, 0.4, 0.8, 1.0),
+    "sphere": (0.8, 0.2, 0.2, 1.0),
+    "capsule": (0.2, 0.8, 0.2, 1.0),
+    "convex_hull": (0.9, 0.6, 0.1, 1.0),
+}
+
+programs.define(
+    "instanced_color",
+    "instanced_color.vert",
+    "simple_color.frag",
+    prefix="#define INSTANCE_CHUNK {}\n".format(INSTANCE_CHUNK),
+)
+
+# category -> (program name, primitive type)
+category_programs = {
+    "vector3": ("vector3", "POINTS"),
+    "cuboid": ("simple_color", "LINES"),
+    "sphere": ("simple_color", "LINES"),
+    "capsule": ("simple_color", "LINES"),
+    "convex_hull": ("simple_color", "LINES"),
+}
+
+draw_handler = None
+
+
+class Primitives:
+    # Everything an object visualizes, independent of view: vector3 points and collider primitives.
+    # Parse results are kept per item fingerprint, so a rebuild only parses items that changed.
+    def __init__(self, items):
+        self.items = items
+        self.fingerprints = [fingerprint for fingerprint, _parsed in items]
+
+        parsed = [parsed for _fingerprint, parsed in items if parsed is not None]
+        # single vector3 points and vector3 arrays are drawn together in one batch
+        self.points = geometry.concatenate(
+            [geometry.points([point for point in parsed if isinstance(point, tuple)])]
+            + [points for points in parsed if isinstance(points, np.ndarray) and len(points)]
+        )
+        self.primitives = [primitive for primitive in parsed if isinstance(primitive, geometry.Primitive)]
+
+        self.centers, self.radii = geometry.bounds(self.primitives)
+        # cuboids and hulls don't have segments, they are kept at 0 so their instances are never split by lod
+        self.rounded = np.array(
+            [primitive.category in ("sphere", "capsule") for primitive in self.primitives], dtype=bool,
+        )
+
+
+class HullItem:
+    # A convex hull item, it is resolved against the mesh of the object it is drawn on.
+    def __init__(self, budget):
+        self.budget = budget
+
+
+def parse_item(item):
+    if item.type == "vector3":
+        return (item.vector3_x, item.vector3_y, item.vector3_z)
+    elif item.type == "cuboid":
+        return geometry.cuboid(
+            (item.cuboid_x, item.cuboid_y, item.cuboid_z),
+            (item.offset_x, item.offset_y, item.offset_z),
+        )
+    elif item.type == "sphere":
+        return geometry.sphere(
+            item.radius,
+            (item.offset_x, item.offset_y, item.offset_z),
+        )
+    elif item.type == "capsule":
+        return geometry.capsule(
+            item.radius,
+            item.height,
+            item.up_vector,
+            (item.offset_x, item.offset_y, item.offset_z),
+        )
+    elif item.type == "convex_hull":
+        return HullItem(item.hull_vertices)
+    elif item.type == "vector3_array":
+        return arrays.item_points(item)
+
+    return None
+
+
+class Geometry:
+    # Drawable geometry of an object for a given segment count per primitive, primitives outside of the
+    # view are left out. Instanced geometry keeps instances grouped by (category, segments) and lets the
+    # gpu place the unit meshes, otherwise every primitive is expanded into line list positions on the cpu.
+    def __init__(self, instanced=False):
+        self.instanced = instanced
+        self.positions = {category: geometry.EMPTY for category in categories}
+        self.instances = {}
+        self.counts = {}
+
+    @staticmethod
+    def build(parsed, segments, instanced):
+        built = Geometry(instanced)
+        built.positions["vector3"] = parsed.points
+
+        # culled primitives have negative segments
+        visible = [(primitive, count) for primitive, count in zip(parsed.primitives, segments) if count >= 0]
+
+        built.counts["vector3"] = len(parsed.points)
+        for primitive, _count in visible:
+            built.counts[primitive.category] = built.counts.get(primitive.category, 0) + 1
+
+        grouped = {}
+        lines = {category: [] for category in line_categories}
+        for primitive, count in visible:
+            if instanced and primitive.instance is not None:
+                grouped.setdefault((primitive.category, count), []).append(primitive.instance)
+            else:
+                lines[primitive.category].append(primitive.lines(count))
+
+        for key, instances in grouped.items():
+            built.instances[key] = geometry.Instances.build(instances)
+        for category, arrays in lines.items():
+            built.positions[category] = geometry.concatenate(arrays)
+
+        return built
+
+    def transformed(self, matrix):
+        world = Geometry(self.instanced)
+        world.counts = self.counts
+        for category, positions in self.positions.items():
+            world.positions[category] = geometry.transform(positions, matrix)
+        for key, instances in self.instances.items():
+            world.instances[key] = instances.transformed(matrix)
+
+        return world
+
+
+def item_fingerprint(item):
+    fingerprint = (
+        item.type,
+        item.vector3_x, item.vector3_y, item.vector3_z,
+        item.offset_x, item.offset_y, item.offset_z,
+        item.cuboid_x, item.cuboid_y, item.cuboid_z,
+        item.radius, item.height, item.up_vector,
+        item.hull_vertices,
+    )
+
+    if item.type == "vector3_array":
+        fingerprint += (meshes.points_hash(arrays.item_points(item)),)
+
+    return fingerprint
+
+
+def visualized_positions(obj):
+    properties = obj.bbu_properties
+
+    if obj.bbu_visualization_show_all:
+        return range(len(properties))
+
+    index = obj.bbu_properties_index
+    if 0 <= index < len(properties):
+        return [index]
+
+    return []
+
+
+def matrix_fingerprint(matrix):
+    return tuple(value for row in matrix for value in row)
+
+
+# Dirty tracking, filled from depsgraph updates, msgbus notifications and item update callbacks. Objects are
+# only reparsed while their pointer is in dirty_objects, otherwise only their positions in dirty_items are,
+# and matrices are only reread while it is in dirty_transforms.
+dirty_objects = set()
+dirty_items = {}
+dirty_transforms = set()
+
+
+def mark_dirty(obj):
+    dirty_objects.add(obj.as_pointer())
+
+
+def mark_item_dirty(obj, position):
+    dirty_items.setdefault(obj.as_pointer(), set()).add(position)
+
+
+def mark_all_dirty():
+    dirty_objects.update(primitives_cache)
+    dirty_transforms.update(matrix_cache)
+    dirty_templates.update(template_cache)
+
+
+def mark_template_users(key):
+    # objects drawn with the template are put together again, without reparsing their own items.
+    # others read the template when they are first drawn with it.
+    for user in template_users.get(key, ()):
+        dirty_items.setdefault(user, set())
+
+
+def mark_template_dirty(template):
+    key = template.as_pointer()
+    dirty_templates.add(key)
+    mark_template_users(key)
+
+
+def mark_template_item_dirty(template, position):
+    key = template.as_pointer()
+    dirty_template_items.setdefault(key, set()).add(position)
+    mark_template_users(key)
+
+
+# object pointer -> matrix fingerprint
+matrix_cache = {}
+
+
+def get_matrix(obj):
+    key = obj.as_pointer()
+
+    matrix = matrix_cache.get(key)
+    if matrix is None or key in dirty_transforms:
+        matrix = matrix_fingerprint(obj.matrix_world)
+        matrix_cache[key] = matrix
+        dirty_transforms.discard(key)
+
+    return matrix
+
+
+# template pointer -> [(id, fingerprint, parsed)] of every template item, shared by all objects linking it
+template_cache = {}
+dirty_templates = set()
+# template pointer -> positions of its items edited since it was parsed
+dirty_template_items = {}
+# template pointer -> pointers of the objects drawn with it
+template_users = {}
+
+
+def get_template_items(template):
+    key = template.as_pointer()
+
+    cached = template_cache.get(key)
+    edited = dirty_template_items.pop(key, None)
+    if cached is not None and key not in dirty_templates:
+        if edited:
+            properties = template.bbu_properties
+            for position in edited:
+                item = properties[position]
+                fingerprint = item_fingerprint(item)
+                if fingerprint != cached[position][1]:
+                    cached[position] = (item.id, fingerprint, parse_item(item))
+        return cached
+
+    dirty_templates.discard(key)
+    previous = {fingerprint: parsed for _id, fingerprint, parsed in cached} if cached is not None else {}
+
+    items = []
+    for item in template.bbu_properties:
+        fingerprint = item_fingerprint(item)
+        parsed = previous[fingerprint] if fingerprint in previous else parse_item(item)
+        items.append((item.id, fingerprint, parsed))
+
+    template_cache[key] = items
+    return items
+
+
+def resolve_hulls(obj, items, previous):
+    # hull items are drawn with the hull of the object's evaluated mesh, the hull key is added to their
+    # fingerprint so mesh edits are picked up. hulls are only read from the cache here, missing ones are
+    # computed by compute_hulls outside of drawing.
+    if not any(isinstance(parsed, HullItem) for _fingerprint, parsed in items):
+        return items
+
+    resolved = []
+
+    for fingerprint, parsed in items:
+        if isinstance(parsed, HullItem):
+            key, (vertices, triangles) = meshes.cached_hull(obj, parsed.budget)
+            fingerprint = fingerprint + (key,)
+            parsed = previous[fingerprint] if fingerprint in previous else geometry.Hull(vertices, triangles)
+        resolved.append((fingerprint, parsed))
+
+    if meshes.pending_hulls and not bpy.app.timers.is_registered(compute_hulls):
+        bpy.app.timers.register(compute_hulls, first_interval=0.0)
+
+    return resolved
+
+
+def tag_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+
+
+def compute_hulls():
+    # timer, computing hulls needs the evaluated mesh which isn't safe to get while drawing
+    computed = meshes.compute_pending(bpy.data.objects, bpy.context.evaluated_depsgraph_get())
+    if computed:
+        # only the hulls are resolved again, the items themselves didn't change
+        for key in computed:
+            dirty_items.setdefault(key, set())
+        tag_redraw()
+
+    return None
+
+
+def parse_items(obj, previous):
+    # visualized items of the object by position, and the ids overriding template items
+    properties = obj.bbu_properties
+
+    parsed_items = {}
+    for position in visualized_positions(obj):
+        item = properties[position]
+        fingerprint = item_fingerprint(item)
+        parsed = previous[fingerprint] if fingerprint in previous else parse_item(item)
+        parsed_items[position] = (fingerprint, parsed)
+
+    overridden = {item.id for item in properties} if obj.bbu_template is not None else set()
+    return parsed_items, overridden
+
+
+def reparse_items(obj, parsed_items, edited):
+    # edits of items that aren't visualized don't change anything drawn
+    properties = obj.bbu_properties
+
+    for position in edited:
+        if position not in parsed_items:
+            continue
+        item = properties[position]
+        fingerprint = item_fingerprint(item)
+        if fingerprint != parsed_items[position][0]:
+            parsed_items[position] = (fingerprint, parse_item(item))
+
+
+# object pointer -> primitives
+primitives_cache = {}
+# object pointer -> (parsed items by position, overridden ids), what get_primitives builds primitives from
+items_cache = {}
+
+
+def get_primitives(obj):
+    key = obj.as_pointer()
+
+    cached = primitives_cache.get(key)
+    edited = dirty_items.pop(key, None)
+    if cached is not None and key not in dirty_objects and edited is None:
+        return cached
+
+    previous = dict(cached.items) if cached is not None else {}
+
+    own = items_cache.get(key)
+    if own is None or key in dirty_objects:
+        dirty_objects.discard(key)
+        own = parse_items(obj, previous)
+        items_cache[key] = own
+    elif edited:
+        reparse_items(obj, own[0], edited)
+
+    parsed_items, overridden = own
+    items = [parsed_items[position] for position in sorted(parsed_items)]
+
+    # template items come first, overridden ones are left out like at export
+    template = obj.bbu_template
+    if template is not None and obj.bbu_visualization_show_all:
+        template_users.setdefault(template.as_pointer(), set()).add(key)
+        items = [
+            (fingerprint, parsed)
+            for id, fingerprint, parsed in get_template_items(template)
+            if id not in overridden
+        ] + items
+
+    items = resolve_hulls(obj, items, previous)
+
+    if cached is not None and cached.fingerprints == [fingerprint for fingerprint, _parsed in items]:
+        return cached
+
+    parsed = Primitives(items)
+
+    primitives_cache[key] = parsed
+    return parsed
+
+
+class View:
+    # Per redraw state shared by every visualized object.
+    def __init__(self, context):
+        scene = context.scene
+        region = context.region
+
+        self.projection = context.region_data.perspective_matrix
+        # instances are drawn in chunks per object, merged draws are a single line batch per category instead
+        self.instanced = (
+            scene.bbu_visualization_instanced and scene.bbu_visualization_mode == "ACTIVE" and instanced_available()
+        )
+        self.lod = scene.bbu_visualization_lod
+        self.lod_min = scene.bbu_visualization_lod_min
+        self.lod_max = scene.bbu_visualization_lod_max
+        self.size = (region.width, region.height)
+
+        self.planes = geometry.frustum_planes(self.projection) if scene.bbu_visualization_culling else None
+
+    def segments(self, parsed, matrix):
+        # segment count per primitive, -1 for primitives culled by the frustum
+        if not parsed.primitives:
+            return ()
+        if not self.lod and self.planes is None:
+            return tuple(np.where(parsed.rounded, geometry.SEGMENTS, 0).tolist())
+
+        centers, radii = geometry.transform_bounds(parsed.centers, parsed.radii, matrix)
+
+        if self.lod:
+            segments = geometry.lod_segments(centers, radii, self.projection, self.size, self.lod_min, self.lod_max)
+        else:
+            segments = geometry.SEGMENTS
+
+        segments = np.where(parsed.rounded, segments, 0)
+
+        if self.planes is not None:
+            segments = np.where(geometry.in_frustum(centers, radii, self.planes), segments, -1)
+
+        return tuple(segments.tolist())
+
+
+# object pointer -> (primitives, instanced, segments, geometry), geometry is only rebuilt when any changes
+geometry_cache = {}
+
+
+def get_geometry(obj, view, matrix):
+    key = obj.as_pointer()
+    parsed = get_primitives(obj)
+    segments = view.segments(parsed, matrix)
+
+    cached = geometry_cache.get(key)
+    if (
+        cached is not None
+        and cached[0] is parsed
+        and cached[1] == view.instanced
+        and cached[2] == segments
+    ):
+        return cached[3]
+
+    built = Geometry.build(parsed, segments, view.instanced)
+
+    geometry_cache[key] = (parsed, view.instanced, segments, built)
+    return built
+
+
+# object pointer -> (geometry, matrix fingerprint, world space geometry)
+world_geometry_cache = {}
+
+
+def get_world_geometry(obj, view):
+    key = obj.as_pointer()
+    matrix = get_matrix(obj)
+    built = get_geometry(obj, view, matrix)
+
+    cached = world_geometry_cache.get(key)
+    if cached is not None and cached[0] is built and cached[1] == matrix:
+        return cached[2]
+
+    world = built.transformed(matrix)
+
+    world_geometry_cache[key] = (built, matrix, world)
+    return world
+
+
+# object pointer -> {category: (positions, batch)}, a batch is only rebuilt when its positions change
+batch_cache = {}
+
+
+def get_batch(key, category, shader, primitive, positions):
+    batches = batch_cache.setdefault(key, {})
+
+    cached = batches.get(category)
+    if cached is not None and cached[0] is positions:
+        return cached[1]
+
+    batch = batch_for_shader(shader, primitive, {"pos": positions})
+    batches[category] = (positions, batch)
+    return batch
+
+
+# (category, segments) -> unit mesh batch for the instanced shader
+unit_batch_cache = {}
+
+
+def get_unit_batch(key):
+    batch = unit_batch_cache.get(key)
+    if batch is not None:
+        return batch
+
+    positions, cap = geometry.unit_mesh(*key)
+    batch = batch_for_shader(programs.get("instanced_color"), "LINES", {
+        "pos": positions.astype(np.float32),
+        "cap": cap.astype(np.float32),
+    })
+
+    unit_batch_cache[key] = batch
+    return batch
+
+
+# category -> (world space positions of every object, batch)
+merged_batch_cache = {}
+
+
+def get_merged_batch(category, shader, primitive, sources):
+    cached = merged_batch_cache.get(category)
+    if (
+        cached is not None
+        and len(cached[0]) == len(sources)
+        and all(map(operator.is_, cached[0], sources))
+    ):
+        return cached[1]
+
+    batch = batch_for_shader(shader, primitive, {"pos": geometry.concatenate(sources)})
+    merged_batch_cache[category] = (sources, batch)
+    return batch
+
+
+object_caches = (
+    primitives_cache, items_cache, matrix_cache, geometry_cache, world_geometry_cache, batch_cache, dirty_items,
+)
+
+
+@bpy.app.handlers.persistent
+def track_updates(_scene, depsgraph):
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Mesh) and update.is_updated_geometry:
+            meshes.geometry_updated(update.id.original.as_pointer())
+            continue
+        if not isinstance(update.id, bpy.types.Object):
+            continue
+
+        key = update.id.original.as_pointer()
+        dirty_transforms.add(key)
+
+        if update.is_updated_geometry:
+            meshes.geometry_updated(key)
+            if update.id.original.data is not None:
+                meshes.geometry_updated(update.id.original.data.as_pointer())
+
+        # transform only updates keep the parsed properties
+        if not update.is_updated_transform or update.is_updated_geometry:
+            dirty_objects.add(key)
+
+    prune_caches()
+
+
+@bpy.app.handlers.persistent
+def track_frame_change(_scene, _depsgraph=None):
+    # animated deformation changes meshes without geometry updates
+    meshes.invalidate()
+    mark_all_dirty()
+
+
+@bpy.app.handlers.persistent
+def track_undo(_scene=None, _depsgraph=None):
+    # undo restores meshes without geometry updates
+    meshes.invalidate()
+    mark_all_dirty()
+
+
+def prune_caches():
+    if not any(object_caches):
+        return
+
+    alive = {obj.as_pointer() for obj in bpy.data.objects}
+    for cache in object_caches:
+        for key in [key for key in cache if key not in alive]:
+            del cache[key]
+
+    dirty_objects.intersection_update(alive)
+    dirty_transforms.intersection_update(alive)
+    for key in [key for key in meshes.latest_hulls if key[0] not in alive]:
+        del meshes.latest_hulls[key]
+
+    if template_cache:
+        alive = {text.as_pointer() for text in bpy.data.texts}
+        for cache in (template_cache, dirty_template_items, template_users):
+            for key in [key for key in cache if key not in alive]:
+                del cache[key]
+        dirty_templates.intersection_update(alive)
+
+
+@bpy.app.handlers.persistent
+def clear_caches(_filepath=None):
+    for cache in object_caches:
+        cache.clear()
+    merged_batch_cache.clear()
+    dirty_objects.clear()
+    dirty_transforms.clear()
+    template_cache.clear()
+    dirty_templates.clear()
+    dirty_template_items.clear()
+    template_users.clear()
+    meshes.clear()
+
+
+# item edits come from their update callbacks, msgbus tells about object settings that change which items are
+# visualized, and only from the ui they are changed on the active object
+msgbus_owner = object()
+
+
+def on_property_changed(name):
+    obj = bpy.context.object
+    if obj is None:
+        return
+    # the active item is only drawn on its own when not every item is
+    if name == "bbu_properties_index" and obj.bbu_visualization_show_all:
+        return
+    mark_dirty(obj)
+
+
+def subscription_keys():
+    # object properties whose edits from the ui change what an object visualizes or exports
+    return [
+        (bpy.types.Object, "bbu_properties_index"),
+        (bpy.types.Object, "bbu_visualization_show_all"),
+        (bpy.types.Object, "bbu_template"),
+    ]
+
+
+def subscribe():
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+
+    for key in subscription_keys():
+        bpy.msgbus.subscribe_rna(key=key, owner=msgbus_owner, args=(key[1],), notify=on_property_changed)
+
+
+@bpy.app.handlers.persistent
+def on_load(_filepath=None):
+    clear_caches()
+    subscribe()
+    apply_stats()
+
+
+def apply_stats():
+    # the update callback of the toggle doesn't run for the value a file was saved with
+    scene = bpy.context.scene
+    if scene is not None and scene.bbu_visualization_stats and programs.has_gpu():
+        enable_stats()
+    else:
+        disable_stats()
+
+
+def draw_batch(shader, batch, transform, projection, color):
+    shader.uniform_float("transform", transform)
+    shader.uniform_float("projection", projection)
+    shader.uniform_float("color", color)
+    gpu.state.depth_test_set('LESS_EQUAL')
+    gpu.state.depth_mask_set(True)
+    batch.draw(shader)
+    gpu.state.depth_mask_set(False)
+
+    return 1
+
+
+def draw_instances(key, instances, transform, projection):
+    category = key[0]
+    shader = programs.get("instanced_color")
+    batch = get_unit_batch(key)
+    matrices, stretches = instances.uniforms()
+
+    shader.uniform_float("transform", transform)
+    shader.uniform_float("projection", projection)
+    shader.uniform_float("color", category_colors[category])
+    gpu.state.depth_test_set('LESS_EQUAL')
+    gpu.state.depth_mask_set(True)
+
+    instances_location = shader.uniform_from_name("instances")
+    stretches_location = shader.uniform_from_name("stretches")
+
+    for start in range(0, len(instances), INSTANCE_CHUNK):
+        count = min(INSTANCE_CHUNK, len(instances) - start)
+        shader.uniform_vector_float(instances_location, matrices[start:start + count], 16, count)
+        shader.uniform_vector_float(stretches_location, stretches[start:start + count], 4, count)
+        batch.draw_instanced(shader, instance_count=count)
+
+    gpu.state.depth_mask_set(False)
+
+    return -(-len(instances) // INSTANCE_CHUNK)
+
+
+def is_visualized(obj):
+    if not hasattr(obj, "bbu_visualization"):
+        return False
+    if not obj.bbu_visualization:
+        return False
+    if not hasattr(obj, "bbu_properties"):
+        return False
+
+    return len(obj.bbu_properties) > 0 or obj.bbu_template is not None
+
+
+# A redraw runs in three phases, generate collects the geometry of every visualized object, batch turns
+# it into draw calls and submit issues them. Each draw call is a (function, arguments) pair.
+
+def active_geometry(obj, view):
+    if obj is None:
+        return []
+    if not is_visualized(obj):
+        return []
+
+    transform = obj.matrix_world
+    return [(obj.as_pointer(), transform, get_geometry(obj, view, get_matrix(obj)))]
+
+
+def active_calls(geometries, view):
+    calls = []
+
+    for key, transform, built in geometries:
+        for category in categories:
+            positions = built.positions[category]
+            if not len(positions):
+                continue
+
+            name, primitive = category_programs[category]
+            shader = programs.get(name)
+            batch = get_batch(key, category, shader, primitive, positions)
+            calls.append((draw_batch, (shader, batch, transform, view.projection, category_colors[category])))
+
+        for instances_key, instances in sorted(built.instances.items()):
+            get_unit_batch(instances_key)
+            calls.append((draw_instances, (instances_key, instances, transform, view.projection)))
+
+    return calls
+
+
+def merged_geometry(objects, view):
+    return [(None, None, get_world_geometry(obj, view)) for obj in objects if is_visualized(obj)]
+
+
+def merged_calls(geometries, view):
+    calls = []
+    worlds = [world for _key, _transform, world in geometries]
+    transform = Matrix.Identity(4)
+
+    for category in categories:
+        sources = [world.positions[category] for world in worlds]
+        sources = [positions for positions in sources if len(positions)]
+        if not sources:
+            continue
+
+        name, primitive = category_programs[category]
+        shader = programs.get(name)
+        batch = get_merged_batch(category, shader, primitive, sources)
+        calls.append((draw_batch, (shader, batch, transform, view.projection, category_colors[category])))
+
+    return calls
+
+
+def count_geometry(sample, geometries):
+    for _key, _transform, built in geometries:
+        for category, count in built.counts.items():
+            sample.count(category, count, len(built.positions.get(category, ())))
+        for (category, segments), instances in built.instances.items():
+            sample.count(category, 0, len(instances) * len(geometry.unit_mesh(category, segments)[0]))
+
+
+# set while instrumentation is enabled, the draw path doesn't time or count anything otherwise
+draw_stats = None
+
+
+def instanced_available():
+    if not hasattr(gpu.types.GPUBatch, "draw_instanced"):
+        return False
+
+    return programs.get("instanced_color") is not None
+
+
+def draw():
+    if programs.get("simple_color") is None or programs.get("vector3") is None:
+        return
+
+    context = bpy.context
+    view = View(context)
+    mode = context.scene.bbu_visualization_mode
+    sample = draw_stats.begin() if draw_stats is not None else None
+
+    if mode == "SELECTED":
+        geometries = merged_geometry(context.selected_objects, view)
+    elif mode == "VISIBLE":
+        geometries = merged_geometry(context.visible_objects, view)
+    else:
+        geometries = active_geometry(context.object, view)
+
+    if sample is not None:
+        sample.lap("generate")
+
+    if mode == "ACTIVE":
+        calls = active_calls(geometries, view)
+    else:
+        calls = merged_calls(geometries, view)
+
+    if sample is not None:
+        sample.lap("batch")
+
+    draw_calls = 0
+    for function, arguments in calls:
+        draw_calls += function(*arguments)
+
+    if sample is not None:
+        sample.lap("submit")
+        sample.draw_calls = draw_calls
+        count_geometry(sample, geometries)
+        draw_stats.end(sample)
+
+
+def draw_overlay():
+    if draw_stats is None:
+        return
+
+    font_id = 0
+    blf.size(font_id, 12)
+    blf.color(font_id, 1.0, 1.0, 1.0, 1.0)
+
+    lines = draw_stats.lines()
+    for index, line in enumerate(reversed(lines)):
+        blf.position(font_id, 20, 20 + index * 16, 0)
+        blf.draw(font_id, line)
+
+
+overlay_handler = None
+
+
+def enable_stats(overlay=True):
+    global draw_stats, overlay_handler
+
+    if draw_stats is None:
+        draw_stats = stats.DrawStats()
+    if overlay and overlay_handler is None:
+        overlay_handler = bpy.types.SpaceView3D.draw_handler_add(draw_overlay, (), "WINDOW", "POST_PIXEL")
+
+    return draw_stats
+
+
+def disable_stats():
+    global draw_stats, overlay_handler
+
+    if overlay_handler is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(overlay_handler, "WINDOW")
+        overlay_handler = None
+
+    draw_stats = None
+
+
+def update_stats(self, _context):
+    if self.bbu_visualization_stats:
+        enable_stats()
+    else:
+        disable_stats()
+
+
+def register():
+    subscribe()
+
+    bpy.types.Scene.bbu_visualization_mode = bpy.props.EnumProperty(
+        name="Visualization Mode",
+        items=visualization_modes,
+        default="ACTIVE",
+    )
+    bpy.types.Scene.bbu_visualization_instanced = bpy.props.BoolProperty(
+        name="Instanced",
+        description=(
+            "Draw colliders of the active object as gpu instances of unit meshes instead of generating their lines "
+            "on the cpu, merged modes always draw lines"
+        ),
+        default=True,
+    )
+    bpy.types.Scene.bbu_visualization_lod = bpy.props.BoolProperty(
+        name="Level of Detail",
+        description="Pick sphere and capsule segment counts from their size on screen",
+        default=True,
+    )
+    bpy.types.Scene.bbu_visualization_lod_min = bpy.props.IntProperty(
+        name="Min Segments",
+        default=geometry.LOD_LEVELS[0],
+        min=4,
+        max=geometry.LOD_LEVELS[-1],
+    )
+    bpy.types.Scene.bbu_visualization_lod_max = bpy.props.IntProperty(
+        name="Max Segments",
+        default=geometry.SEGMENTS,
+        min=4,
+        max=geometry.LOD_LEVELS[-1],
+    )
+
+    bpy.types.Scene.bbu_visualization_culling = bpy.props.BoolProperty(
+        name="Frustum Culling",
+        description="Skip primitives whose bounds are outside of the view",
+        default=True,
+    )
+
+    bpy.types.Scene.bbu_visualization_stats = bpy.props.BoolProperty(
+        name="Statistics",
+        description="Time the visualization draw phases and show them in the viewport",
+        default=False,
+        update=update_stats,
+    )
+
+    # nothing is ever drawn in background mode, e.g. headless exports
+    if programs.has_gpu():
+        global draw_handler
+        draw_handler = bpy.types.SpaceView3D.draw_handler_add(draw, (), "WINDOW", "POST_VIEW")
+
+    bpy.app.handlers.depsgraph_update_post.append(track_updates)
+    bpy.app.handlers.frame_change_post.append(track_frame_change)
+    bpy.app.handlers.undo_post.append(track_undo)
+    bpy.app.handlers.redo_post.append(track_undo)
+    bpy.app.handlers.load_post.append(on_load)
+
+
+def unregister():
+    global draw_handler
+    if draw_handler is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(draw_handler, "WINDOW")
+        draw_handler = None
+    disable_stats()
+
+    bpy.app.handlers.depsgraph_update_post.remove(track_updates)
+    bpy.app.handlers.frame_change_post.remove(track_frame_change)
+    bpy.app.handlers.undo_post.remove(track_undo)
+    bpy.app.handlers.redo_post.remove(track_undo)
+    bpy.app.handlers.load_post.remove(on_load)
+    if bpy.app.timers.is_registered(compute_hulls):
+        bpy.app.timers.unregister(compute_hulls)
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+    clear_caches()
+
+    del bpy.types.Scene.bbu_visualization_mode
+    del bpy.types.Scene.bbu_visualization_instanced
+    del bpy.types.Scene.bbu_visualization_lod
+    del bpy.types.Scene.bbu_visualization_lod_min
+    del bpy.types.Scene.bbu_visualization_lod_max
+    del bpy.types.Scene.bbu_visualization_culling
+    del bpy.types.Scene.bbu_visualization_stats
+    unit_batch_cache.clear()
@@ -2,12 +2,18 @@ use std::marker::PhantomData;
 use bevy::ecs::system::CommandQueue;
 use bevy::gltf::GltfExtras;
 use bevy::prelude::*;
-use serde::de::DeserializeOwned;
+use serde::de::{DeserializeOwned, Error as _};
 use serde::Deserialize;
+use serde_json::Value;
 
 mod bbu_manager;
+mod live_link;
+mod packed;
 
 pub use bbu_manager::{BBUManager, BBUSceneSpawnedEvent, BBUSceneSpawnedEventWithId};
+pub use live_link::{apply_live_updates, BBULiveLink, BBULiveLinkPlugin, BBULiveUpdate, LIVE_LINK_ADDRESS};
+pub use packed::{BBUPackedData, BBUPackedDataError, PACKED_ACCESSOR_NAME};
+use packed::PackedRef;
 
 pub trait SceneId: Copy + Clone + Send + Sync + 'static {}
 
@@ -41,11 +47,24 @@ fn inform_if_loaded_system<Id: SceneId>(
     bbu_manager.inform_if_loaded(&asset_server, writer);
 }
 
-#[derive(Deserialize, Clone, Copy, PartialEq, Default, Debug)]
+#[derive(Deserialize, Clone, PartialEq, Default, Debug)]
 struct BBUObjectData<Data> {
     bbu_object_data: Option<Data>,
+    /// Index into the shared table, written instead of ``bbu_object_data`` by the shared export format.
+    bbu_object_ref: Option<usize>,
+    /// Offsets into the packed buffer, written instead of ``bbu_object_data`` by the binary export format.
+    bbu_object_packed: Option<PackedRef>,
+}
+
+/// Shared table of unique object data, attached to the first root node of a scene by the shared
+/// export format.
+#[derive(Deserialize, Clone, PartialEq, Default, Debug)]
+struct BBUObjectTable {
+    bbu_object_table: Option<Vec<Value>>,
 }
 
+const OBJECT_TABLE_KEY: &str = "\"bbu_object_table\"";
+
 #[derive(Deserialize, Clone, Copy, PartialEq, Default, Debug)]
 pub struct CuboidData {
     pub cuboid: Vec3,
@@ -66,6 +85,25 @@ pub struct CapsuleData {
     up_vector: Vec3,
 }
 
+/// Points of a vector3 array, exported as flat x, y, z floats.
+#[derive(Deserialize, Clone, PartialEq, Default, Debug)]
+#[serde(from = "Vec<f32>")]
+pub struct Vector3ArrayData(pub Vec<Vec3>);
+
+impl From<Vec<f32>> for Vector3ArrayData {
+    fn from(values: Vec<f32>) -> Self {
+        Self(values.chunks_exact(3).map(|point| Vec3::new(point[0], point[1], point[2])).collect())
+    }
+}
+
+/// Convex hull of an object's mesh, computed at export. Triangles wind counter-clockwise seen from
+/// outside.
+#[derive(Deserialize, Clone, PartialEq, Default, Debug)]
+pub struct ConvexHullData {
+    pub points: Vec<Vec3>,
+    pub indices: Vec<[u32; 3]>,
+}
+
 /// All the required info for parsing scene extras and spawning scenes.
 pub struct BBUScene<'a, Id> {
     pub id: Id,
@@ -75,8 +113,33 @@ pub struct BBUScene<'a, Id> {
 
 impl<'a, Id> BBUScene<'a, Id> {
     /// Parses scene extras using ``parser`` and applies changes to the scene world.
+    ///
+    /// Scenes exported with the shared format keep a single table of unique object data; it is parsed
+    /// once and nodes referencing it are resolved from it instead of parsing their own copy.
     pub fn parse<Data: DeserializeOwned, F>(
         &mut self,
+        parser: F,
+    ) where
+        F: FnMut(&mut Commands, Entity, &Name, Result<Option<Data>, serde_json::Error>),
+    {
+        self.parse_inner(None, parser)
+    }
+
+    /// Same as [`BBUScene::parse`], for scenes exported with the binary format. Numeric object data of
+    /// such scenes is resolved from ``packed``, read from the exported file.
+    pub fn parse_packed<Data: DeserializeOwned, F>(
+        &mut self,
+        packed: &BBUPackedData,
+        parser: F,
+    ) where
+        F: FnMut(&mut Commands, Entity, &Name, Result<Option<Data>, serde_json::Error>),
+    {
+        self.parse_inner(Some(packed), parser)
+    }
+
+    fn parse_inner<Data: DeserializeOwned, F>(
+        &mut self,
+        packed: Option<&BBUPackedData>,
         mut parser: F,
     ) where
         F: FnMut(&mut Commands, Entity, &Name, Result<Option<Data>, serde_json::Error>),
@@ -88,14 +151,50 @@ impl<'a, Id> BBUScene<'a, Id> {
             .iter(&self.scene.world)
             .collect::<Vec<(Entity, &Name, &GltfExtras)>>();
 
+        let table = query
+            .iter()
+            .filter(|(_, _, extras)| extras.value.contains(OBJECT_TABLE_KEY))
+            .find_map(|(_, _, extras)| {
+                serde_json::from_str::<BBUObjectTable>(extras.value.as_ref())
+                    .ok()
+                    .and_then(|table| table.bbu_object_table)
+            })
+            .unwrap_or_default();
+
         let mut commands = Commands::new(&mut command_queue, &self.scene.world);
 
         for (entity, name, extras) in query {
             let value = serde_json::from_str::<BBUObjectData<Data>>(extras.value.as_ref())
-                .map(|data| data.bbu_object_data);
+                .and_then(|data| resolve(data, &table, packed));
             parser(&mut commands, entity, name, value);
         }
 
         command_queue.apply(&mut self.scene.world)
     }
 }
+
+fn resolve<Data: DeserializeOwned>(
+    data: BBUObjectData<Data>,
+    table: &[Value],
+    packed: Option<&BBUPackedData>,
+) -> Result<Option<Data>, serde_json::Error> {
+    match (data.bbu_object_data, data.bbu_object_ref, data.bbu_object_packed) {
+        (Some(data), _, _) => Ok(Some(data)),
+        (None, Some(index), _) => table
+            .get(index)
+            .ok_or_else(|| serde_json::Error::custom(
+                format!("bbu_object_ref `{}` is out of the shared table's range", index)
+            ))
+            .and_then(|value| Data::deserialize(value))
+            .map(Some),
+        (None, None, Some(packed_ref)) => packed
+            .ok_or_else(|| serde_json::Error::custom(
+                "scene uses the binary export format, parse it with `parse_packed`"
+            ))?
+            .resolve(packed_ref)
+            .map_err(serde_json::Error::custom)
+            .and_then(|value| Data::deserialize(value))
+            .map(Some),
+        (None, None, None) => Ok(None),
+    }
+}
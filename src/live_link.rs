@@ -0,0 +1,224 @@
+use std::collections::HashMap;
+use std::io::{ErrorKind, Read};
+use std::net::{SocketAddr, TcpStream};
+use std::time::Duration;
+use bevy::prelude::*;
+use serde::de::DeserializeOwned;
+use serde::Deserialize;
+use serde_json::{Map, Value};
+
+/// Address the Blender addon's live link listens on by default.
+pub const LIVE_LINK_ADDRESS: &str = "127.0.0.1:7878";
+
+/// Seconds between connection attempts while Blender isn't listening.
+const RECONNECT_INTERVAL: f32 = 1.0;
+const CONNECT_TIMEOUT: Duration = Duration::from_millis(20);
+
+/// Receives property changes streamed by the Blender addon's live link and sends them as
+/// [`BBULiveUpdate`] events, see [`apply_live_updates`] for patching entities with them.
+pub struct BBULiveLinkPlugin {
+    pub address: String,
+}
+
+impl Default for BBULiveLinkPlugin {
+    fn default() -> Self {
+        Self {
+            address: LIVE_LINK_ADDRESS.to_string(),
+        }
+    }
+}
+
+impl Plugin for BBULiveLinkPlugin {
+    fn build(&self, app: &mut App) {
+        app
+            .add_event::<BBULiveUpdate>()
+            .insert_resource(BBULiveLink::new(&self.address))
+            .add_systems(PreUpdate, receive_live_updates_system);
+    }
+}
+
+fn receive_live_updates_system(
+    mut live_link: ResMut<BBULiveLink>,
+    time: Res<Time>,
+    mut writer: EventWriter<BBULiveUpdate>,
+) {
+    live_link.connect(time.elapsed_seconds());
+    writer.send_batch(live_link.receive());
+}
+
+/// Whole object data of a Blender object after a live change, same as its ``bbu_object_data`` in an
+/// export with the inline format.
+#[derive(Event, Clone, PartialEq, Debug)]
+pub struct BBULiveUpdate {
+    /// Name of the object, which is the name of the entity of its glTF node.
+    pub name: String,
+    /// Empty when the object was deleted or renamed in Blender.
+    pub data: Value,
+}
+
+impl BBULiveUpdate {
+    pub fn parse<Data: DeserializeOwned>(&self) -> Result<Data, serde_json::Error> {
+        Data::deserialize(&self.data)
+    }
+}
+
+#[derive(Deserialize)]
+struct LiveMessage {
+    /// Set when the message has every object, sent on connect and when Blender loads a file.
+    #[serde(default)]
+    reset: bool,
+    #[serde(default)]
+    objects: HashMap<String, ObjectChanges>,
+}
+
+#[derive(Deserialize)]
+struct ObjectChanges {
+    #[serde(default)]
+    set: Map<String, Value>,
+    #[serde(default)]
+    remove: Vec<String>,
+}
+
+/// Connection to the live link and the object data streamed through it so far, changes only carry
+/// the properties that changed.
+#[derive(Resource)]
+pub struct BBULiveLink {
+    address: String,
+    stream: Option<TcpStream>,
+    buffer: Vec<u8>,
+    objects: HashMap<String, Map<String, Value>>,
+    next_attempt: f32,
+}
+
+impl BBULiveLink {
+    pub fn new(address: &str) -> Self {
+        Self {
+            address: address.to_string(),
+            stream: None,
+            buffer: Vec::new(),
+            objects: HashMap::new(),
+            next_attempt: 0.0,
+        }
+    }
+
+    pub fn is_connected(&self) -> bool {
+        self.stream.is_some()
+    }
+
+    fn connect(&mut self, now: f32) {
+        if self.stream.is_some() || now < self.next_attempt {
+            return;
+        }
+        self.next_attempt = now + RECONNECT_INTERVAL;
+
+        let Ok(address) = self.address.parse::<SocketAddr>() else {
+            return;
+        };
+        let Ok(stream) = TcpStream::connect_timeout(&address, CONNECT_TIMEOUT) else {
+            return;
+        };
+        if stream.set_nonblocking(true).is_err() {
+            return;
+        }
+        let _ = stream.set_nodelay(true);
+
+        self.buffer.clear();
+        self.stream = Some(stream);
+    }
+
+    /// Reads what arrived without blocking, returns one update per changed object.
+    fn receive(&mut self) -> Vec<BBULiveUpdate> {
+        let Some(stream) = self.stream.as_mut() else {
+            return Vec::new();
+        };
+
+        let mut chunk = [0; 16 * 1024];
+        let mut disconnected = false;
+        loop {
+            match stream.read(&mut chunk) {
+                Ok(0) => {
+                    disconnected = true;
+                    break;
+                },
+                Ok(read) => self.buffer.extend_from_slice(&chunk[..read]),
+                Err(error) if error.kind() == ErrorKind::WouldBlock => break,
+                Err(error) if error.kind() == ErrorKind::Interrupted => continue,
+                Err(_) => {
+                    disconnected = true;
+                    break;
+                },
+            }
+        }
+
+        if disconnected {
+            self.stream = None;
+        }
+
+        let mut changed = HashMap::new();
+        while let Some(end) = self.buffer.iter().position(|byte| *byte == b'\n') {
+            let line = self.buffer.drain(..=end).collect::<Vec<u8>>();
+            match serde_json::from_slice::<LiveMessage>(&line) {
+                Ok(message) => self.apply(message, &mut changed),
+                Err(error) => warn!("invalid live link message: {}", error),
+            }
+        }
+
+        changed
+            .into_iter()
+            .map(|(name, data)| BBULiveUpdate { name, data })
+            .collect()
+    }
+
+    fn apply(&mut self, message: LiveMessage, changed: &mut HashMap<String, Value>) {
+        if message.reset {
+            self.objects.clear();
+        }
+
+        for (name, changes) in message.objects {
+            let data = self.objects.entry(name.clone()).or_default();
+            for id in changes.remove {
+                data.remove(&id);
+            }
+            data.extend(changes.set);
+
+            let value = Value::Object(data.clone());
+            // objects deleted or renamed in Blender have everything removed
+            if data.is_empty() {
+                self.objects.remove(&name);
+            }
+            changed.insert(name, value);
+        }
+    }
+}
+
+/// Runs ``parser`` on every entity named like an object of a live update, like [`crate::BBUScene::parse`]
+/// does when a scene is loaded, so components it inserts replace the ones built from the old data.
+pub fn apply_live_updates<Data: DeserializeOwned, F>(
+    commands: &mut Commands,
+    updates: &mut EventReader<BBULiveUpdate>,
+    entities: &Query<(Entity, &Name)>,
+    mut parser: F,
+) where
+    F: FnMut(&mut Commands, Entity, &Name, Result<Option<Data>, serde_json::Error>),
+{
+    let updates = updates.iter().collect::<Vec<&BBULiveUpdate>>();
+    if updates.is_empty() {
+        return;
+    }
+
+    let mut named = HashMap::<&str, Vec<(Entity, &Name)>>::new();
+    for (entity, name) in entities.iter() {
+        named.entry(name.as_str()).or_default().push((entity, name));
+    }
+
+    for update in updates {
+        for (entity, name) in named.get(update.name.as_str()).into_iter().flatten() {
+            // like nodes without object data, removed objects have none
+            let data = match update.data.as_object() {
+                Some(data) if data.is_empty() => Ok(None),
+                _ => update.parse().map(Some),
+            };
+            parser(commands, *entity, name, data);
+        }
+    }
+}
@@ -0,0 +1,195 @@
+use serde::Deserialize;
+use serde_json::{json, Map, Value};
+use thiserror::Error;
+
+/// Name of the accessor the binary export format packs numeric object data into.
+pub const PACKED_ACCESSOR_NAME: &str = "bbu_object_packed";
+
+const GLB_MAGIC: &[u8] = b"glTF";
+const GLB_JSON_CHUNK: &[u8] = b"JSON";
+const GLB_BIN_CHUNK: &[u8] = b"BIN\0";
+
+/// Node extras written by the binary export format in place of ``bbu_object_data``.
+#[derive(Deserialize, Clone, PartialEq, Default, Debug)]
+pub(crate) struct PackedRef {
+    /// Index of the first float of the node's records.
+    offset: usize,
+    /// Id and item type of each record, in the order they are packed.
+    fields: Vec<(String, String)>,
+    /// Object data that isn't numeric, kept as json.
+    #[serde(default)]
+    data: Map<String, Value>,
+}
+
+/// Numeric object data packed into a glTF buffer by the binary export format.
+///
+/// Bevy doesn't keep glTF buffers around after loading, so it is read from the exported file itself,
+/// either a ``.glb`` or a ``.gltf`` with its buffer.
+#[derive(Clone, PartialEq, Default, Debug)]
+pub struct BBUPackedData {
+    values: Vec<f32>,
+}
+
+#[derive(Deserialize)]
+#[serde(rename_all = "camelCase")]
+struct Document {
+    #[serde(default)]
+    accessors: Vec<Accessor>,
+    #[serde(default)]
+    buffer_views: Vec<BufferView>,
+}
+
+#[derive(Deserialize)]
+#[serde(rename_all = "camelCase")]
+struct Accessor {
+    buffer_view: Option<usize>,
+    #[serde(default)]
+    byte_offset: usize,
+    count: usize,
+    name: Option<String>,
+}
+
+#[derive(Deserialize)]
+#[serde(rename_all = "camelCase")]
+struct BufferView {
+    #[serde(default)]
+    byte_offset: usize,
+}
+
+impl BBUPackedData {
+    /// Reads packed data from the bytes of a ``.glb`` file.
+    pub fn from_glb(bytes: &[u8]) -> Result<Self, BBUPackedDataError> {
+        if bytes.len() < 12 || &bytes[0..4] != GLB_MAGIC {
+            return Err(BBUPackedDataError::NotGlb);
+        }
+
+        let mut json = None;
+        let mut bin: &[u8] = &[];
+        let mut offset = 12;
+
+        while offset + 8 <= bytes.len() {
+            let length = u32::from_le_bytes([
+                bytes[offset], bytes[offset + 1], bytes[offset + 2], bytes[offset + 3],
+            ]) as usize;
+            let kind = &bytes[offset + 4..offset + 8];
+            let chunk = bytes
+                .get(offset + 8..offset + 8 + length)
+                .ok_or(BBUPackedDataError::Truncated)?;
+
+            match kind {
+                GLB_JSON_CHUNK => json = Some(chunk),
+                GLB_BIN_CHUNK => bin = chunk,
+                _ => {},
+            }
+
+            offset += 8 + length;
+        }
+
+        Self::from_gltf(json.ok_or(BBUPackedDataError::NoJsonChunk)?, bin)
+    }
+
+    /// Reads packed data from the json of a ``.gltf`` file and the contents of its first buffer.
+    pub fn from_gltf(json: &[u8], buffer: &[u8]) -> Result<Self, BBUPackedDataError> {
+        let document = serde_json::from_slice::<Document>(json)?;
+
+        let Some(accessor) = document.accessors
+            .iter()
+            .find(|accessor| accessor.name.as_deref() == Some(PACKED_ACCESSOR_NAME))
+        else {
+            return Ok(Self::default());
+        };
+
+        let view = accessor.buffer_view
+            .and_then(|index| document.buffer_views.get(index))
+            .ok_or(BBUPackedDataError::Truncated)?;
+
+        let start = view.byte_offset + accessor.byte_offset;
+        let bytes = buffer
+            .get(start..start + accessor.count * 4)
+            .ok_or(BBUPackedDataError::Truncated)?;
+
+        let values = bytes
+            .chunks_exact(4)
+            .map(|float| f32::from_le_bytes([float[0], float[1], float[2], float[3]]))
+            .collect();
+
+        Ok(Self { values })
+    }
+
+    /// All packed floats, records of every node one after another.
+    pub fn values(&self) -> &[f32] {
+        &self.values
+    }
+
+    /// Rebuilds the object data of a node as it would be written by the inline export format.
+    pub(crate) fn resolve(&self, packed: PackedRef) -> Result<Value, BBUPackedDataError> {
+        let PackedRef { mut offset, fields, mut data } = packed;
+
+        for (id, item_type) in fields {
+            let rest = self.values.get(offset..).unwrap_or_default();
+            let length = record_length(&item_type, rest)
+                .ok_or_else(|| BBUPackedDataError::UnknownType(item_type.clone()))?;
+            let record = self.values
+                .get(offset..offset + length)
+                .ok_or(BBUPackedDataError::OutOfRange(offset))?;
+
+            data.insert(id, read_record(&item_type, record));
+            offset += length;
+        }
+
+        Ok(Value::Object(data))
+    }
+}
+
+/// Number of floats of a record, ``rest`` is the buffer from the start of the record.
+fn record_length(item_type: &str, rest: &[f32]) -> Option<usize> {
+    match item_type {
+        "float" => Some(1),
+        "vector3" => Some(3),
+        "cuboid" => Some(6),
+        "sphere" => Some(4),
+        "capsule" => Some(8),
+        // point count followed by the points
+        "vector3_array" => Some(1 + 3 * rest.first().copied().unwrap_or_default() as usize),
+        _ => None,
+    }
+}
+
+fn read_record(item_type: &str, record: &[f32]) -> Value {
+    match item_type {
+        "float" => json!(record[0]),
+        "vector3" => json!(record),
+        "cuboid" => json!({
+            "cuboid": &record[0..3],
+            "offset": &record[3..6],
+        }),
+        "sphere" => json!({
+            "radius": record[0],
+            "offset": &record[1..4],
+        }),
+        "capsule" => json!({
+            "radius": record[0],
+            "height": record[1],
+            "offset": &record[2..5],
+            "up_vector": &record[5..8],
+        }),
+        "vector3_array" => json!(&record[1..]),
+        _ => Value::Null,
+    }
+}
+
+#[derive(Error, Debug)]
+pub enum BBUPackedDataError {
+    #[error("file isn't a glb")]
+    NotGlb,
+    #[error("glb doesn't have a json chunk")]
+    NoJsonChunk,
+    #[error("packed data is truncated")]
+    Truncated,
+    #[error("packed record at `{0}` is out of range")]
+    OutOfRange(usize),
+    #[error("unknown packed item type `{0}`")]
+    UnknownType(String),
+    #[error("invalid gltf json: {0}")]
+    Json(#[from] serde_json::Error),
+}
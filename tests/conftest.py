@@ -0,0 +1,5 @@
+# The addon package imports bpy, its bpy-free modules are imported directly like the benchmarks do.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "bevy_blender_utils"))
@@ -0,0 +1,49 @@
+import os
+
+import batch_export
+
+
+def test_sources_of_one_directory_are_written_into_output():
+    outputs = batch_export.output_paths(["/assets/a.blend", "/assets/b.blend"], "/build", ".glb")
+
+    assert outputs == {"/assets/a.blend": "/build/a.glb", "/assets/b.blend": "/build/b.glb"}
+
+
+def test_sources_with_the_same_name_keep_their_directories():
+    sources = ["/assets/a/level.blend", "/assets/b/level.blend", "/assets/b/deep/level.blend"]
+    outputs = batch_export.output_paths(sources, "/build", ".gltf")
+
+    assert outputs == {
+        "/assets/a/level.blend": "/build/a/level.gltf",
+        "/assets/b/level.blend": "/build/b/level.gltf",
+        "/assets/b/deep/level.blend": "/build/b/deep/level.gltf",
+    }
+    assert len(set(outputs.values())) == len(sources)
+
+
+def test_files_with_the_same_name_are_exported_and_skipped_separately(tmp_path, monkeypatch):
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "level.blend").write_bytes(directory.encode())
+
+    exported = []
+
+    def export_file(_blender, source, output, _arguments):
+        exported.append(output)
+        with open(output, "wb") as file:
+            file.write(b"glTF")
+        return 0.0, None
+
+    monkeypatch.setattr(batch_export, "export_file", export_file)
+    monkeypatch.setattr(batch_export, "count_nodes", lambda _output: 0)
+    sources = [str(tmp_path / "a" / "level.blend"), str(tmp_path / "b" / "level.blend")]
+    output = tmp_path / "build"
+
+    assert batch_export.main(sources + ["--output", str(output)]) == 0
+    assert sorted(exported) == [str(output / "a" / "level.glb"), str(output / "b" / "level.glb")]
+
+    # both are up to date on the next run
+    exported.clear()
+    assert batch_export.main(sources + ["--output", str(output)]) == 0
+    assert exported == []
+    assert os.path.exists(output / "a" / "level.glb") and os.path.exists(output / "b" / "level.glb")
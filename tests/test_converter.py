@@ -0,0 +1,147 @@
+import json
+from array import array
+
+import pytest
+
+import converter
+
+# bbu_object_data with a value of every item type that survives a round trip
+OBJECT_DATA = {
+    "name": "crate",
+    "empty": "",
+    "alive": True,
+    "hidden": False,
+    "health": 12,
+    "speed": 2.5,
+    "direction": [1.0, 2.0, -3.0],
+    "box": {"cuboid": [1.0, 0.5, 2.0], "offset": [0.0, 0.0, 0.0]},
+    "shifted_box": {"cuboid": [1.0, 0.5, 2.0], "offset": [0.0, 1.0, -0.5]},
+    "ball": {"radius": 0.5, "offset": [0.0, 0.0, 0.0]},
+    "shifted_ball": {"radius": 0.25, "offset": [1.0, 2.0, 3.0]},
+    "capsule_x": {"radius": 0.3, "height": 1.25, "up_vector": [1, 0, 0], "offset": [0.0, 0.0, 0.0]},
+    "capsule_y": {"radius": 0.3, "height": 1.25, "up_vector": [0, 0, 1], "offset": [0.0, 0.0, 1.5]},
+    "capsule_z": {"radius": 0.5, "height": 1.0, "up_vector": [0, 1, 0], "offset": [0.0, 0.0, 0.0]},
+    "path": [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, -1.0, 0.5, 0.25],
+    "no_points": [],
+}
+
+
+def normalized(value):
+    # what a glTF file gives back, tuples become lists
+    return json.loads(json.dumps(value))
+
+
+def export_items(items, export_format):
+    # (node extras, root extras, packed floats) like the exporter writes them
+    extras = normalized({"bbu_properties": items})
+
+    if export_format == "BINARY":
+        packed = converter.PackedBuffer()
+        converter.convert_extras(extras, packed)
+        if "bbu_object_packed" in extras:
+            extras["bbu_object_packed"]["accessor"] = 0
+        return normalized(extras), {}, array("f", packed.tobytes()).tolist()
+
+    converter.convert_extras(extras)
+    root = {}
+    if export_format == "SHARED":
+        table = converter.SharedTable()
+        table.share_extras(extras)
+        root = table.attach(root)
+
+    return normalized(extras), normalized(root), []
+
+
+def import_data(extras, root, values):
+    return converter.node_object_data(extras, root.get("bbu_object_table", ()), lambda _accessor: values)
+
+
+def round_trip_items(items, export_format="INLINE"):
+    return normalized(import_data(*export_items(items, export_format)))
+
+
+def round_trip(object_data, export_format):
+    items, skipped = converter.restore_properties(object_data)
+    assert skipped == []
+
+    return round_trip_items(items, export_format)
+
+
+def assert_close(actual, expected):
+    # packed values are float32
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            assert_close(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for entry, expected_entry in zip(actual, expected):
+            assert_close(entry, expected_entry)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-6)
+    else:
+        assert actual == expected
+
+
+@pytest.mark.parametrize("export_format", ("INLINE", "SHARED"))
+def test_round_trip(export_format):
+    assert round_trip(OBJECT_DATA, export_format) == OBJECT_DATA
+
+
+def test_round_trip_packed():
+    object_data = dict(OBJECT_DATA, speed=0.1, ball={"radius": 1 / 3, "offset": [0.0, 0.0, 0.0]})
+    assert_close(round_trip(object_data, "BINARY"), object_data)
+
+
+@pytest.mark.parametrize("export_format", ("INLINE", "SHARED", "BINARY"))
+def test_single_point_array_comes_back_as_vector3(export_format):
+    items, _skipped = converter.restore_properties({"point": [1.0, 2.0, 3.0]})
+
+    assert converter.read_type(items[0]) == "vector3"
+    assert round_trip({"point": [1.0, 2.0, 3.0]}, export_format) == {"point": [1.0, 2.0, 3.0]}
+
+
+@pytest.mark.parametrize("count, budget", ((4, 32), (40, 40), (300, 255)))
+def test_convex_hull_keeps_only_a_vertex_budget(count, budget):
+    hull = {"points": [[float(index), 0.0, 0.0] for index in range(count)], "indices": [[0, 1, 2]]}
+    items, _skipped = converter.restore_properties({"hull": hull})
+
+    assert converter.read_type(items[0]) == "convex_hull"
+    assert items[0].get("hull_vertices", converter.defaults["hull_vertices"]) == budget
+    # hulls come from the object's mesh, an item alone exports an empty one
+    assert round_trip({"hull": hull}, "INLINE") == {"hull": {"points": [], "indices": []}}
+
+
+def test_values_no_type_converts_to_are_skipped():
+    items, skipped = converter.restore_properties({
+        "nothing": None,
+        "unknown": {"color": [1, 0, 0]},
+        "pair": [1.0, 2.0],
+        "words": ["a", "b", "c"],
+        "bad_up": {"radius": 0.5, "height": 1.0, "up_vector": [1, 1, 0]},
+        "kept": 1,
+    })
+
+    assert [item["id"] for item in items] == ["kept"]
+    assert skipped == ["nothing", "unknown", "pair", "words", "bad_up"]
+
+
+def test_zero_offsets_are_exported():
+    # data of older exports or other tools may leave them out, they are exported again
+    items, _skipped = converter.restore_properties({"box": {"cuboid": [1.0, 1.0, 1.0]}})
+
+    assert round_trip_items(items) == {"box": {"cuboid": [1.0, 1.0, 1.0], "offset": [0.0, 0.0, 0.0]}}
+
+
+def test_defaults_are_not_stored():
+    items, _skipped = converter.restore_properties({"ball": {"radius": 0.5}})
+
+    assert items == [{"id": "ball", "type": converter.type_indices["sphere"]}]
+
+
+def test_addon_scene_settings_are_stripped_from_scene_extras():
+    extras = {"bbu_data_version": 1, "bbu_export_format": 2, "bbu_visualization_mode": 0, "weather": "rain"}
+
+    assert converter.strip_scene_extras(extras) == {"weather": "rain"}
+    assert converter.strip_scene_extras({"bbu_live_link_port": 7878}) is None
+    assert converter.strip_scene_extras(None) is None
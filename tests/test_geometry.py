@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import geometry
+
+# rotated, non-uniformly scaled and translated, like an object's world matrix
+WORLD = np.array((
+    (0.0, -2.0, 0.0, 1.0),
+    (1.5, 0.0, 0.0, -2.0),
+    (0.0, 0.0, 0.5, 3.0),
+    (0.0, 0.0, 0.0, 1.0),
+)) @ np.array((
+    (1.0, 0.0, 0.0, 0.0),
+    (0.0, np.cos(0.7), -np.sin(0.7), 0.0),
+    (0.0, np.sin(0.7), np.cos(0.7), 0.0),
+    (0.0, 0.0, 0.0, 1.0),
+))
+
+INSTANCES = [
+    ("cuboid", "cuboid", lambda: geometry.cuboid_instance((0.5, 1.0, 2.0), (0.1, -0.2, 0.3))),
+    ("sphere", "sphere", lambda: geometry.sphere_instance(0.75, (1.0, 0.0, -1.0))),
+] + [
+    (
+        "capsule_{}".format(up_vector),
+        "capsule",
+        lambda up_vector=up_vector: geometry.capsule_instance(0.4, 1.5, up_vector, (0.0, 2.0, 1.0)),
+    )
+    for up_vector in geometry.up_vector_axes
+]
+
+
+def instanced_lines(category, instances, segments, matrix):
+    return geometry.Instances.build(instances).transformed(matrix).lines(geometry.unit_mesh(category, segments))
+
+
+def cpu_lines(category, instances, segments, matrix):
+    mesh = geometry.unit_mesh(category, segments)
+    return geometry.transform(
+        geometry.concatenate([geometry.instance_lines(mesh, instance) for instance in instances]), matrix,
+    )
+
+
+@pytest.mark.parametrize("name, category, make", INSTANCES, ids=[name for name, _category, _make in INSTANCES])
+@pytest.mark.parametrize("segments", (8, geometry.SEGMENTS))
+def test_instanced_lines_match_cpu_lines(name, category, make, segments):
+    instances = [make()]
+
+    np.testing.assert_allclose(
+        instanced_lines(category, instances, segments, WORLD), cpu_lines(category, instances, segments, WORLD),
+        atol=1e-5,
+    )
+
+
+def test_instances_of_many_capsules_match_cpu_lines():
+    instances = [
+        geometry.capsule_instance(0.2 + index * 0.1, 1.0 + index, "yp", (index, 0.0, 0.0)) for index in range(5)
+    ]
+
+    np.testing.assert_allclose(
+        instanced_lines("capsule", instances, 16, WORLD), cpu_lines("capsule", instances, 16, WORLD), atol=1e-5,
+    )
+
+
+def test_inverted_capsule_matches_cpu_lines():
+    # height below radius draws the capsule inverted on both paths
+    instances = [geometry.capsule_instance(1.0, 0.5, "xp", (0.0, 0.0, 0.0))]
+
+    np.testing.assert_allclose(
+        instanced_lines("capsule", instances, 12, WORLD), cpu_lines("capsule", instances, 12, WORLD), atol=1e-5,
+    )
+
+
+def test_empty_instances_have_no_lines():
+    assert len(geometry.EMPTY_INSTANCES.transformed(WORLD).lines(geometry.unit_mesh("sphere", 8))) == 0